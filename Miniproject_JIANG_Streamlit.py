@@ -3,19 +3,12 @@
 
 # %%
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import numpy as np
-import cartopy.crs as ccrs
-import cartopy.feature as cfeature
-from streamlit_folium import folium_static
-from branca.colormap import linear
-import cmocean
-import matplotlib.colors as mcolors
+import os
+from zonal import instrument
 
-# %%
-# Use the 'balance' colormap from cmocean
-cmap = cmocean.cm.balance
+# Per-section timers and memory probes, off unless ZONAL_TRACE is set
+instrument.start_run()
+instrument.begin("Header and imports")
 
 # %%
 # Page configuration
@@ -37,16 +30,63 @@ st.write("1. Exploring 'Zonal Annual Means' Data")
 
 st.write("The 'Zonal Annual Means' data available on NASA's website (https://data.giss.nasa.gov/gistemp/) refers to a dataset that provides average values of temperature, calculated over a year and averaged across different latitudinal zones (zonal means).")
 
+# %%
+# pandas and matplotlib take about a second to import, so they are only
+# imported once the title and the opening lines of the Data section are on
+# screen. The Introduction comes later: the rest of the Data section already
+# shows the loaded table
+from zonal.charts import (
+    GROWTH_DEFAULT, PART1_EXTRATROPICS, PART1_NORTH, PART2_EXTRATROPICS, PART2_NORTH,
+    ROLLING_DEFAULT, TRENDS_DEFAULT, growth_spec, render_chart, rolling_spec, single_zone_spec, trends_spec,
+)
+from zonal.data import VARIABLES
+from zonal.features import build_features, derived_columns, zone_columns
+from zonal.ingest import load_source
+from zonal.interactive import VEGA_LITE, chart_backend, comparison_chart
+from zonal.map_frames import map_frame
+from zonal.rolling import DEFAULT_WINDOW, MAX_WINDOW, MIN_WINDOW, STATISTICS, rolling_trends
+from zonal.trends import MODELS, fit_r2, fit_trends
+
 # %%
 # Load the dataset
 st.write("Data download here(https://data.giss.nasa.gov/gistemp/tabledata_v4/T_AIRS/ZonAnn.Ts+dSST.csv).")
-df = pd.read_csv("ZonAnn.Ts+dSST.csv")
+instrument.begin("Load data")
+# Parsed once per file version and shared by every rerun and session.
+# ZONAL_SOURCE can point to a larger product instead (a monthly zonal CSV or
+# a gridded .npy array), which is reduced to the same annual table
+SOURCE = os.environ.get("ZONAL_SOURCE", "ZonAnn.Ts+dSST.csv")
+raw_df = load_source(SOURCE)
+
+instrument.begin("Derived features")
+# Raw zones plus the '_diff' and '_accum' series of every zone, computed once
+# per data version (read-only: int16 Year, float32 values)
+df = build_features(raw_df)
+latitudinal_columns = zone_columns(raw_df)
+diff_columns = derived_columns(raw_df, "_diff")
+accum_columns = derived_columns(raw_df, "_accum")
+
+
+def current_data():
+    """Load the data again for a fragment rerun.
+
+    A widget change only reruns its fragment, so each fragment reloads the
+    data: a stat call, a header read and cache lookups while the file is
+    unchanged. When the file changed since the page was drawn, the whole page
+    is rerun instead.
+    """
+    raw = load_source(SOURCE)
+    if raw.attrs.get("data_version") != raw_df.attrs.get("data_version"):
+        st.rerun(scope="app")
+    return raw, build_features(raw)
+
+
+instrument.begin("Data description")
 
 # %%
 # Optional: Expandable section to display the first five lines of the data
 with st.expander("👉 Expand here to see the first five lines of the data"):
     st.write("First Five Lines of the Data")
-    st.write(df.head())
+    st.write(raw_df.head())
 
 
 # %%
@@ -62,32 +102,8 @@ st.markdown("- **Latitudinal Zones**: The values for each variable represent the
 # Table explaining the variables
 with st.expander("👉Expand here to see the table explaining the variables"):
     st.write("Variable Descriptions")
-    variables = {
-        "Variable Index": [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14],
-        "Variable Name": [
-            "Year", "Glob", "NHem", "SHem", "24N-90N", "24S-24N", "90S-24S", "64N-90N", 
-            "44N-64N", "24N-44N", "EQU-24N", "24S-EQU", "44S-24S", "64S-44S", "90S-64S"
-        ],
-        "Description": [
-            "The year for which the data is reported.",
-            "Global average of the parameter (averaged over the entire Earth).",
-            "Northern Hemisphere average of the parameter (averaged from 0°N to 90°N).",
-            "Southern Hemisphere average of the parameter (averaged from 0°S to 90°S).",
-            "Average of the parameter for the latitudinal band from 24°N to 90°N.",
-            "Average of the parameter for the latitudinal band from 24°S to 24°N. Covers the tropics and subtropics, including the equatorial region.",
-            "Average of the parameter for the latitudinal band from 90°S to 24°S.",
-            "Average of the parameter for the latitudinal band from 64°N to 90°N. Focuses on the Arctic Circle and polar regions in the Northern Hemisphere.",
-            "Average of the parameter for the latitudinal band from 44°N to 64°N. Covers the mid-latitudes in the Northern Hemisphere, including temperate regions.",
-            "Average of the parameter for the latitudinal band from 24°N to 44°N. Covers the subtropical and warm temperate regions in the Northern Hemisphere.",
-            "Average of the parameter for the latitudinal band from the Equator (0°) to 24°N. Focuses on the northern tropics, from the equator to 24°N.",
-            "Average of the parameter for the latitudinal band from 24°S to the Equator (0°). Focuses on the southern tropics, from 24°S to the equator.",
-            "Average of the parameter for the latitudinal band from 44°S to 24°S. Covers the subtropical and warm temperate regions in the Southern Hemisphere.",
-            "Average of the parameter for the latitudinal band from 64°S to 44°S. Covers the mid-latitudes in the Southern Hemisphere, including temperate regions.",
-            "Average of the parameter for the latitudinal band from 90°S to 64°S. Focuses on the Antarctic Circle and polar regions in the Southern Hemisphere."
-        ]
-    }
-    variables_df = pd.DataFrame(variables)
-    st.table(variables_df)
+    # One read-only table per process, shared by every session
+    st.table(VARIABLES)
 
 # %%
 ### **Introduction**
@@ -101,6 +117,7 @@ st.write("By plotting and visualising these trends, I aim to highlight the stark
 ##########################################################
 ######## Exploring Anomalised Temperature Trends #########
 ##########################################################
+instrument.begin("Part I")
 st.markdown("<h3 style='color:steelblue;'>Part I: Anomalised Temperature Trends</h3>", unsafe_allow_html=True)
 st.write("The graphs below illustrates the temperature trends over time across different latitudinal zones, with a particular focus on the Arctic region.")
 
@@ -116,54 +133,42 @@ col1, col2 = st.columns([1, 1])
 # First graph: 
 with col1:
     st.write("<p style='font-size: 12px;'>Three Large Latitudinal Zones Temperature Trends Comparison Over Time</p>", unsafe_allow_html=True)
-    fig1_1, ax1_1 = plt.subplots(figsize=(8, 5))
-    ax1_1.plot(df['Year'], df['24N-90N'], label='Northern Extratropics Zone', marker='o', ms=1)
-    ax1_1.plot(df['Year'], df['24S-24N'], label='Tropical and Subtropical Zone', marker='o', ms=1)
-    ax1_1.plot(df['Year'], df['90S-24S'], label='Southern Extratropics Zone', marker='o', ms=1)
-    ax1_1.set_title('Latitudinal Zones Comparison Over Time')
-    ax1_1.set_xlabel('Year')
-    ax1_1.set_ylabel('Yearly Average Temperature')
-    ax1_1.grid(True, linestyle='--', alpha=0.7)
-    ax1_1.legend()
-    st.pyplot(fig1_1)
+    st.image(render_chart(df, PART1_EXTRATROPICS), width="stretch")
 
 # Second graph: 
 with col2:
     st.write("<p style='font-size: 12px;'>Zones in North Hemisphere Temperature Trends Comparison Over Time</p>", unsafe_allow_html=True)
-    fig1_2, ax1_2 = plt.subplots(figsize=(8, 5))
-    ax1_2.plot(df['Year'], df['64N-90N'], label='Northern Polar Zone', marker='o', ms=1)
-    ax1_2.plot(df['Year'], df['44N-64N'], label='Northern Temperate Zone', marker='o', ms=1)
-    ax1_2.plot(df['Year'], df['24N-44N'], label='Northern Subtropical Zone', marker='o', ms=1)
-    ax1_2.plot(df['Year'], df['EQU-24N'], label='Northern Tropical Zone', marker='o', ms=1)
-    ax1_2.set_title('North Hemisphere Comparison Over Time')
-    ax1_2.set_xlabel('Year')
-    ax1_2.set_ylabel('Yearly Average Temperature')
-    ax1_2.grid(True, linestyle='--', alpha=0.7)
-    ax1_2.legend()
-    st.pyplot(fig1_2)
+    st.image(render_chart(df, PART1_NORTH), width="stretch")
 
 
 # %%
 ## Plotting interactive plot for muiltple trends
 #Create the side bar 
 st.write('<p style="color: lightblue; font-weight: bold;"> 📈⚙️ Multi-Zones Temperature Trends Comparison Over Time</p>', unsafe_allow_html=True)
-selected_columns = st.multiselect(
-    "✨Select muiltple latitudinal zones to comapre temperature trends between various latitudinal zones",
-    df.columns[1:].tolist(),  # Convert Index to a list
-    default=["Glob", "90S-64S", "64N-90N"]
-)
-# Create the figure for multiple trends
-if selected_columns: 
-    fig2, ax2 = plt.subplots(figsize=(10, 6))   
-    for col in selected_columns:
-        ax2.plot(df['Year'], df[col], label=col)
-    ax2.set_title("Various Latitudinal Zones Temperature Trends Comparison Over Time")
-    ax2.set_xlabel("Year")
-    ax2.set_ylabel("Temperature")
-    ax2.legend()
-    st.pyplot(fig2) 
+if chart_backend() == VEGA_LITE:
+    # Every zone is sent to the browser once; the legend shows or hides them
+    # without rerunning the script
+    st.caption("Click a zone in the legend to show it, shift-click to compare several. Drag to pan, scroll to zoom.")
+    st.vega_lite_chart(comparison_chart(df, trends_spec(latitudinal_columns), TRENDS_DEFAULT), width="stretch")
 else:
-    st.warning("You must select at least one latitudinal zone for comparison.")
+    # A fragment: changing the selection reruns only this function, not the page
+    @st.fragment(key="trend_comparison")
+    def trend_comparison():
+        with instrument.fragment("trend_comparison"):
+            _, df = current_data()
+            selected_columns = st.multiselect(
+                "✨Select muiltple latitudinal zones to comapre temperature trends between various latitudinal zones",
+                latitudinal_columns,
+                default=TRENDS_DEFAULT,
+                key="trend_zones",
+            )
+            # Create the figure for multiple trends (rendered images are cached per selection)
+            if selected_columns: 
+                st.image(render_chart(df, trends_spec(selected_columns)), width="stretch")
+            else:
+                st.warning("You must select at least one latitudinal zone for comparison.")
+
+    trend_comparison()
 
 # %%
 st.write("The graph above presents a comparison of the gobal average temperature trend to the trends of two distinct latitudinal zones: 90S-64S (Southern Polar Zone) and 64N-90N (Northern Polar Zone).")
@@ -176,34 +181,30 @@ st.write("The default graph shows that both the Southern and Northern Polar Zone
 with st.expander("✨ (Bonus) Expand here to plot single latitudinal zone temperature evolution"):
     #Create the side bar 
     st.write('<p style="color: lightblue; font-weight: bold;"> 📈⚙️ Single Latitudinal Zone Temperature Evolution</p>', unsafe_allow_html=True)
-    selected_column = st.selectbox("✨Select a latitudinal zone to plot single trend", df.columns[1:])
-    # Create the figure for the plot
-    fig3, ax3 = plt.subplots(figsize=(10, 6))
-    ax3.plot(df['Year'], df[selected_column])
-    ax3.set_title(f"{selected_column} over Time")
-    ax3.set_xlabel("Year")
-    ax3.set_ylabel("Temperature")
-    st.pyplot(fig3)  
+
+    @st.fragment(key="single_zone_plot")
+    def single_zone_plot():
+        with instrument.fragment("single_zone_plot"):
+            _, df = current_data()
+            selected_column = st.selectbox("✨Select a latitudinal zone to plot single trend", latitudinal_columns, key="single_zone")
+            # Create the figure for the plot (rendered images are cached per zone)
+            st.image(render_chart(df, single_zone_spec(selected_column)), width="stretch")
+
+    single_zone_plot()
 
 
 
 ##################################################################
 ######### Exploring Trends for The Growth of Temperature #########
 ##################################################################
+instrument.begin("Part II")
 st.markdown("<h3 style='color:steelblue;'>Part II: Temperature Growth Trends</h3>", unsafe_allow_html=True)
 st.write("Temperature growth, or the increase in global or regional temperatures over time, is a central metric for understanding climate change. While analysing the evolution of anomalised temperature provides valuable insights into long-term warming trends, examining the **rate of change in temperature for each latitudinal zone per year** offers an additional layer of understanding. The rate of change highlights how quickly temperatures are rising, revealing critical patterns such as acceleration or regional disparities in warming. By plotting the rate of change, we can better visualise the dynamics of global warming, compare its impacts across different regions, and identify areas where mitigation and adaptation efforts are most urgently needed - such as The Arctic.")
 
-# %%
-# Generate Yearly Temperature Difference
-latitudinal_columns = df.columns[1:]  
-for col in latitudinal_columns:
-    df[f"{col}_diff"] = df[col].diff()
-
 # %%
 # Optional: Expandable section to display the first five lines of the data
 with st.expander("👉 Expand here to see the first five lines of the data with rate of change "):
     st.write("First Five Lines of the Data")
-    diff_columns = [col for col in df.columns if "_diff" in col]
     st.write(df[diff_columns].head())
 # %%
 # Optional: Expandable section to display the calculation for rate of change
@@ -230,54 +231,41 @@ col1, col2 = st.columns([1, 1])
 # First graph: 
 with col1:
     st.write("<p style='font-size: 12px;'>Three Large Latitudinal Zones Temperature Growth Trends Comparison Over Time</p>", unsafe_allow_html=True)
-    fig4_1, ax4_1 = plt.subplots(figsize=(8, 5))
-    ax4_1.plot(df['Year'], df['24N-90N_diff'], label='Northern Extratropics Zone', marker='o', ms=1)
-    ax4_1.plot(df['Year'], df['24S-24N_diff'], label='Tropical and Subtropical Zone', marker='o', ms=1)
-    ax4_1.plot(df['Year'], df['90S-24S_diff'], label='Southern Extratropics Zone', marker='o', ms=1)
-    ax4_1.set_title('Three Large Latitudinal Zones Temperature Growth Comparison Over Time')
-    ax4_1.set_xlabel('Year')
-    ax4_1.set_ylabel('Yearly Average Temperature Change')
-    ax4_1.grid(True, linestyle='--', alpha=0.7)
-    ax4_1.legend()
-    st.pyplot(fig4_1)
+    st.image(render_chart(df, PART2_EXTRATROPICS), width="stretch")
 
 # Second graph: 
 with col2:
     st.write("<p style='font-size: 12px;'>Zones in North Hemisphere Temperature Trends Comparison Over Time</p>", unsafe_allow_html=True)
-    fig4_2, ax4_2 = plt.subplots(figsize=(8, 5))
-    ax4_2.plot(df['Year'], df['64N-90N_diff'], label='Northern Polar Zone', marker='o', ms=1)
-    ax4_2.plot(df['Year'], df['44N-64N_diff'], label='Northern Temperate Zone', marker='o', ms=1)
-    ax4_2.plot(df['Year'], df['24N-44N_diff'], label='Northern Subtropical Zone', marker='o', ms=1)
-    ax4_2.plot(df['Year'], df['EQU-24N_diff'], label='Northern Tropical Zone', marker='o', ms=1)
-    ax4_2.set_title('North Hemisphere Temperature Growth Comparison Over Time')
-    ax4_2.set_xlabel('Year')
-    ax4_2.set_ylabel('Yearly Average Temperature Change')
-    ax4_2.grid(True, linestyle='--', alpha=0.7)
-    ax4_2.legend()
-    st.pyplot(fig4_2)
+    st.image(render_chart(df, PART2_NORTH), width="stretch")
 
 
 # %%
 ## Plotting interactive plot for muiltple trends
 #Create the side bar 
 st.write('<p style="color: lightblue; font-weight: bold;">📈⚙️ Multi-Zones Temperature Growth Trends Comparison Over Time</p>', unsafe_allow_html=True)
-selected_columns = st.multiselect(
-    "✨Select latitudinal zones to compare",
-    df.columns[1:].tolist(),  
-    default=["64N-90N_diff", "90S-64S_diff"]
-)
-# Create the figure for muiltple trends
-if selected_columns: 
-    fig5, ax5 = plt.subplots(figsize=(10, 6))
-    for col in selected_columns:
-        ax5.plot(df['Year'], df[col], label=col)
-    ax5.set_title("Various Latitudinal Zones Temperature Growth Comparison Over Time")
-    ax5.set_xlabel("Year")
-    ax5.set_ylabel("Temperature/Yearly Average Temperature Change")
-    ax5.legend()
-    st.pyplot(fig5) 
+if chart_backend() == VEGA_LITE:
+    # Every zone is sent to the browser once; the legend shows or hides them
+    # without rerunning the script
+    st.caption("Click a zone in the legend to show it, shift-click to compare several. Drag to pan, scroll to zoom.")
+    st.vega_lite_chart(comparison_chart(df, growth_spec(latitudinal_columns + diff_columns), GROWTH_DEFAULT), width="stretch")
 else:
-    st.warning("You may select at least one latitudinal zones for comparison.")
+    @st.fragment(key="growth_comparison")
+    def growth_comparison():
+        with instrument.fragment("growth_comparison"):
+            _, df = current_data()
+            selected_columns = st.multiselect(
+                "✨Select latitudinal zones to compare",
+                latitudinal_columns + diff_columns,
+                default=GROWTH_DEFAULT,
+                key="growth_zones",
+            )
+            # Create the figure for muiltple trends (rendered images are cached per selection)
+            if selected_columns: 
+                st.image(render_chart(df, growth_spec(selected_columns)), width="stretch")
+            else:
+                st.warning("You may select at least one latitudinal zones for comparison.")
+
+    growth_comparison()
 # %%
 st.write("The graph above allows for the comparison of both temperature trends and temperature growth across different latitudinal zones. The default option specifically focuses on the 64N-90N region (Northern Polar Zone) in comparison to the 90S-64S region (Southern Polar Zone). It appears that between the years 1900 and 1960, the North Pole experienced more volatile temperature changes than the South Pole. After 1960, both polar zones show increased volatility.")
 
@@ -286,19 +274,14 @@ st.write("The graph above allows for the comparison of both temperature trends a
 ###############################################################
 ######### Exploring Trends for Accumulated Temperature #########
 ###############################################################
+instrument.begin("Part III")
 st.markdown("<h3 style='color:steelblue;'>Part III:Accumulated Temperature</h3>", unsafe_allow_html=True)
 st.write("Global warming is often measured through average temperature increases, but another powerful metric for understanding its impact is accumulated temperature. This metric represents the total amount of warming over a specific period, calculated by summing temperature anomalies above a baseline. Unlike average temperature, which smooths out variations, accumulated temperature captures the cumulative effect of warming, providing a clearer picture of long-term trends and their impacts. This approach not only underscores the urgency of addressing Arctic warming but also provides a compelling way to communicate the cumulative impact of global warming to a broader audience.")
 
-# %%
-# Generate Accumulated Temperature 
-for col in diff_columns:
-    df[f"{col.replace('_diff', '_accum')}"] = df[col].cumsum()
-
 # %%
 # Optional: Expandable section to display the first five lines of the data
 with st.expander("👉 Expand here to see the first five lines of the data of accumulated temperature"):
     st.write("First Five Lines of the Data")
-    accum_columns = [col for col in df.columns if col.endswith("_accum")]
     st.write(df[accum_columns].head())
 
 # %%
@@ -316,99 +299,121 @@ with st.expander("👉 Expand here to see the detailed calculation for accumulat
 st.write('<p style="color: lightblue; font-weight: bold;">Exploring Accumulated Temperature with an interactive map 🌍</p>', unsafe_allow_html=True)
 
 # %%
-# Define the zone accumulation columns
-zone_accum_columns = [
-    "64N-90N_accum", "44N-64N_accum", "24N-44N_accum", "EQU-24N_accum",
-    "24S-EQU_accum", "44S-24S_accum", "64S-44S_accum", "90S-64S_accum"
-]
-
-# Define latitudinal bounds for each zone
-lat_zones = {
-    "64N-90N": (64, 90),
-    "44N-64N": (44, 64),
-    "24N-44N": (24, 44),
-    "EQU-24N": (0, 24),
-    "24S-EQU": (-24, 0),
-    "44S-24S": (-44, -24),
-    "64S-44S": (-64, -44),
-    "90S-64S": (-90, -64),
-}
-
-# Year selection slider
-selected_year = st.slider("Select Year 🔥", int(df["Year"].min()), int(df["Year"].max()), 2024)
-
-# Filter data for the selected year
-df_year = df[df["Year"] == selected_year]
-
-# Ensure accumulation columns are numeric and replace NaN with 0.001
-df_year[zone_accum_columns] = df_year[zone_accum_columns].apply(pd.to_numeric, errors='coerce').fillna(0.001)
+# The zone accumulation columns and their latitudinal bounds live in
+# zonal.maps (ZONE_ACCUM_COLUMNS, LAT_ZONES)
+
+instrument.begin("Part III map")
+
+# Playing shows one year per tick: this nested fragment reruns itself every
+# 0.15 s (in the browser, without blocking the script) and advances the year
+# kept in session_state. After one pass it switches play off, so the slider
+# is back in control.
+@st.fragment(key="map_player", run_every=0.15)
+def map_player():
+    with instrument.fragment("map_player"):
+        _, df = current_data()
+        years = df["Year"].tolist()
+        i = st.session_state.setdefault("map_play_index", 0)
+        if i < len(years):
+            st.image(map_frame(df, years[i], SOURCE), caption=str(years[i]), width="stretch")
+            st.session_state.map_play_index = i + 1
+        else:
+            del st.session_state["map_play_index"]
+            st.session_state.map_play = False
+            # A full run drops this fragment and its timer
+            st.rerun()
+
+
+# The slider, the play toggle and the map form one fragment, so moving the
+# slider only redraws the map
+@st.fragment(key="accumulation_map")
+def accumulation_map():
+    with instrument.fragment("accumulation_map"):
+        _, df = current_data()
+        # Year selection slider
+        selected_year = st.slider("Select Year 🔥", int(df["Year"].min()), int(df["Year"].max()), int(df["Year"].max()), key="map_year")
+        play = st.toggle("▶️ Play through the years", key="map_play")
+
+        # Each year's map (bands from band_table over the cached basemap) is
+        # pre-rendered by `python -m zonal.map_frames`; missing frames are rendered
+        # on demand and stored, so the slider only reads an image
+        if play:
+            map_player()
+        else:
+            # Switching play off stops the player; the next pass starts over
+            st.session_state.pop("map_play_index", None)
+            st.image(map_frame(df, selected_year, SOURCE), width="stretch")
+
+accumulation_map()
 
 # %%
-# Create DataFrame for latitudinal bands
-data = []
-for zone_col in zone_accum_columns:
-    zone = zone_col.replace("_accum", "")
-    lat_min, lat_max = lat_zones.get(zone, (0, 0))
-    temperature = df_year[zone_col].values[0] if not df_year.empty else 0.001
-    data.append({"Zone": zone, "Latitude_Min": lat_min, "Latitude_Max": lat_max, "Temperature": temperature})
-
-df_bands = pd.DataFrame(data)
+st.write("As users move forward in time (e.g., towards 2024), the map reveals a significant increase in accumulated temperature around the North Pole. The region shows a pronounced shift towards warmer-than-average temperatures, with large areas consistently displaying positive temperature anomalies. This trend is particularly striking, as the Arctic has warmed by approximately **3°C since the pre-industrial era**, compared to the global average of about **1.1°C**, underscoring the phenomenon of **Arctic amplification**.")
 
-# %%
-# Normalize temperatures to the range [-4, 4]
-min_temp = -4  
-max_temp = 4   
-df_bands["ColorNorm"] = np.clip(df_bands["Temperature"], min_temp, max_temp)  
-df_bands["ColorNorm"] = (df_bands["ColorNorm"] - min_temp) / (max_temp - min_temp) 
+st.write("The rapid growth of accumulated temperature around the North Pole highlights the disproportionate impact of climate change on the Arctic region. Over the decades, the region has transitioned from minimal temperature deviations to exhibiting some of the highest positive anomalies on the map. This accelerated warming is driven by feedback mechanisms such as the loss of reflective sea ice, which has been shrinking at a rate of **12.6% per decade** since the late 1970s, and the thawing of permafrost, which releases significant amounts of methane and carbon dioxide, further exacerbating global warming.")
 
-# Use the 'balance' colormap from cmocean (NASA/NOAA-like)
-cmap = cmocean.cm.balance
+st.write("The Arctic is a critical region for global warming research, not only because it is warming two to four times faster than the global average but also due to its profound influence on global climate systems. The decline in Arctic sea ice, which reached its **second-lowest extent on record in 2023**, disrupts weather patterns worldwide, contributing to extreme events such as heatwaves, cold snaps, and intensified storms. Recent findings from the **2023 IPCC report** warn that if global temperatures rise by **2°C**, the Arctic could experience ice-free summers as early as the mid-21st century. This would have cascading effects on ecosystems, sea levels, and weather systems globally. The Arctic’s disproportionate warming underscores its dual role as both a barometer and a driver of climate change, emphasizing the urgent need for global action to reduce emissions, mitigate impacts, and protect this vital region to ensure the stability of the planet’s climate system.🌏💪")
 
-# %%
-# Create the map
-fig, ax = plt.subplots(subplot_kw={"projection": ccrs.PlateCarree()})
-
-# Add map features
-ax.add_feature(cfeature.LAND, color="lightgray")
-ax.add_feature(cfeature.OCEAN, color="lightblue")
-ax.add_feature(cfeature.COASTLINE, linewidth=0.5)
-ax.add_feature(cfeature.BORDERS, linestyle=":", linewidth=0.5)
-
-# Draw latitudinal zones
-for _, row in df_bands.iterrows():
-    lat_min, lat_max = row["Latitude_Min"], row["Latitude_Max"]
-    color = cmap(row["ColorNorm"])  
-    ax.fill_between(
-        x=[-180, 180],  
-        y1=lat_min,  
-        y2=lat_max,  
-        color=color,  
-        alpha=0.9,  
-        transform=ccrs.PlateCarree(),  
-    )
-
-# Add a colorbar
-sm = plt.cm.ScalarMappable(cmap=cmap, norm=plt.Normalize(vmin=min_temp, vmax=max_temp))
-sm.set_array([])
-plt.colorbar(sm, ax=ax, orientation="horizontal", label="Temperature Variation (°C)")
-
-# Set map extent
-ax.set_global()
-
-# Display the map in Streamlit
-st.pyplot(fig)
+instrument.begin("Part IV")
+st.markdown("<h3 style='color:steelblue;'>Part IV: Rolling Trends</h3>", unsafe_allow_html=True)
+st.write("A single trend line hides how fast each zone warmed at different times. The chart below slides a window of a chosen number of years along the record and, for every window, fits a straight line to the temperature anomaly. It shows the slope of that line (the warming rate in °C per decade), the mean anomaly of the window, or the volatility of the years around the local trend. Each point is placed at the last year of its window.")
+
+# Every zone and statistic is computed at once per window length and cached,
+# so only the chart is rendered when the selection changes
+@st.fragment(key="rolling_trends")
+def rolling_trend_chart():
+    with instrument.fragment("rolling_trends"):
+        raw_df, _ = current_data()
+        col1, col2 = st.columns([1, 1])
+        with col1:
+            window = st.slider("Window length (years) 🪟", MIN_WINDOW, MAX_WINDOW, DEFAULT_WINDOW, key="rolling_window")
+        with col2:
+            statistic = st.radio("Statistic", list(STATISTICS), format_func=STATISTICS.get, horizontal=True, key="rolling_statistic")
+        selected_zones = st.multiselect(
+            "✨Select latitudinal zones to compare",
+            latitudinal_columns,
+            default=ROLLING_DEFAULT,
+            key="rolling_zones",
+        )
+        if selected_zones:
+            rolling = rolling_trends(raw_df, window)
+            st.image(render_chart(rolling, rolling_spec(selected_zones, window, statistic)), width="stretch")
+        else:
+            st.warning("You must select at least one latitudinal zone for comparison.")
+
+rolling_trend_chart()
+
+st.write("With the default 30-year window the Northern Polar Zone's warming rate climbs well above the global rate from the 1980s onwards and is about three times the global rate for the latest window, another view of Arctic amplification. The two polar zones are also by far the most volatile, the Southern Polar Zone even more so than the Northern one.")
+
+instrument.begin("Part V")
+st.markdown("<h3 style='color:steelblue;'>Part V: Data Analysis</h3>", unsafe_allow_html=True)
+st.write("The python notebook tests a quadratic and an exponential model for the growth of accumulated temperature in the Arctic Zone. The table below fits those two models, plus a linear one, to the accumulated temperature of every latitudinal zone, and reports the share of the variability each model explains (R²).")
 
 # %%
-st.write("As users move forward in time (e.g., towards 2024), the map reveals a significant increase in accumulated temperature around the North Pole. The region shows a pronounced shift towards warmer-than-average temperatures, with large areas consistently displaying positive temperature anomalies. This trend is particularly striking, as the Arctic has warmed by approximately **3°C since the pre-industrial era**, compared to the global average of about **1.1°C**, underscoring the phenomenon of **Arctic amplification**.")
-
-st.write("The rapid growth of accumulated temperature around the North Pole highlights the disproportionate impact of climate change on the Arctic region. Over the decades, the region has transitioned from minimal temperature deviations to exhibiting some of the highest positive anomalies on the map. This accelerated warming is driven by feedback mechanisms such as the loss of reflective sea ice, which has been shrinking at a rate of **12.6% per decade** since the late 1970s, and the thawing of permafrost, which releases significant amounts of methane and carbon dioxide, further exacerbating global warming.")
+# All zones and models are fitted together and cached per data version
+trend_fits = fit_trends(df, accum_columns)
+# Formatted by the browser: a pandas Styler would be rebuilt on every run
+st.dataframe(
+    fit_r2(df, accum_columns),
+    width="stretch",
+    column_config={model: st.column_config.NumberColumn(format="%.3f") for model in MODELS},
+)
 
-st.write("The Arctic is a critical region for global warming research, not only because it is warming two to four times faster than the global average but also due to its profound influence on global climate systems. The decline in Arctic sea ice, which reached its **second-lowest extent on record in 2023**, disrupts weather patterns worldwide, contributing to extreme events such as heatwaves, cold snaps, and intensified storms. Recent findings from the **2023 IPCC report** warn that if global temperatures rise by **2°C**, the Arctic could experience ice-free summers as early as the mid-21st century. This would have cascading effects on ecosystems, sea levels, and weather systems globally. The Arctic’s disproportionate warming underscores its dual role as both a barometer and a driver of climate change, emphasizing the urgent need for global action to reduce emissions, mitigate impacts, and protect this vital region to ensure the stability of the planet’s climate system.🌏💪")
+with st.expander("👉 Expand here to see the coefficients, standard errors and p-values of every model"):
+    st.write("For the exponential model the coefficients are those of log(temp_accum + shift), as in the notebook.")
+    st.dataframe(trend_fits, width="stretch", hide_index=True)
 
-st.markdown("<h3 style='color:steelblue;'>Part IV: Data Analysis</h3>", unsafe_allow_html=True)
-st.write("I kindly invite you to check the python notebook for the section of data analysis. Thank you!")
+st.write("I kindly invite you to check the python notebook for a detailed interpretation of the models. Thank you!")
 
 # %%
 # Add a footer
 st.markdown("---")
 st.caption("Hope you had a fun read! Created by Meng JIANG")
+
+# %%
+# Diagnostics panel, only when tracing is enabled
+trace = instrument.finish_run()
+if trace is not None:
+    with st.sidebar:
+        st.subheader("Diagnostics")
+        st.caption(f"Trace lines appended to {instrument.TRACE_FILE}")
+        st.dataframe(trace.table(), hide_index=True)
@@ -0,0 +1,269 @@
+"""Rerun latency of the dashboard for each real interaction.
+
+Drives Miniproject_JIANG_Streamlit.py headlessly with streamlit's AppTest and
+scripts the interactions users make: a new session, a plain rerun (opening an
+expander does not rerun the script; its content is part of every run), both
+multiselects, the single-zone selectbox, the year slider and the rolling
+window slider. Each interaction alternates between two values so every
+measured run really changes the widget; caches are warmed first, so the
+numbers are steady-state reruns.
+
+Every widget lives in an st.fragment, and in the browser changing it reruns
+only that fragment. AppTest always reruns the whole script, so the runner it
+uses is swapped for one that queues the widget's fragment, as the frontend
+does; --full-reruns measures whole-script reruns instead.
+
+AppTest also gives every run a new script cache, so the whole script was
+recompiled on each run (about 1.1 MB of peak memory, more than any
+interaction); the runner shares one cache across runs, like the server.
+
+Both rely on streamlit internals (AppTest's runner class and fragment
+storage, the runner's request queue and script cache), written against
+streamlit TESTED_STREAMLIT. With a version that lacks them the script stops
+with a message naming what is missing instead of measuring something else.
+
+For each interaction it records the median wall time, then from one traced
+run the peak of traced memory and the number of allocations: blocks
+allocated during the run and still alive after it, from a tracemalloc
+snapshot diff. What the harness itself costs, measured on a script that does
+nothing, is subtracted from both. It compares all three with the stored
+baseline and exits non-zero when any of them regresses past the threshold.
+
+    python benchmarks/bench_app.py                    # compare with the baseline
+    python benchmarks/bench_app.py --update-baseline  # record a new baseline
+
+The baseline is machine-specific: record it on the machine that runs the check.
+"""
+import argparse
+import dataclasses
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import streamlit
+
+# The multiselects only exist with the matplotlib backend
+os.environ["ZONAL_CHART_BACKEND"] = "matplotlib"
+
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache  # noqa: E402
+from streamlit.runtime.scriptrunner_utils.script_requests import ScriptRequests  # noqa: E402
+from streamlit.testing.v1 import AppTest, app_test, local_script_runner  # noqa: E402
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SCRIPT = os.path.join(ROOT, "Miniproject_JIANG_Streamlit.py")
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app_baseline.json")
+
+# The streamlit version whose internals FragmentScriptRunner was written against
+TESTED_STREAMLIT = "1.65.0"
+
+# Interaction name -> function applying the i-th change to the app
+INTERACTIONS = {
+    "rerun": lambda at, i: None,
+    "trend_zones": lambda at, i: at.multiselect(key="trend_zones").set_value(
+        [["Glob", "90S-64S", "64N-90N"], ["NHem", "SHem"]][i % 2]),
+    "single_zone": lambda at, i: at.selectbox(key="single_zone").set_value(["Glob", "64N-90N"][i % 2]),
+    "growth_zones": lambda at, i: at.multiselect(key="growth_zones").set_value(
+        [["64N-90N_diff", "90S-64S_diff"], ["Glob_diff"]][i % 2]),
+    "map_year": lambda at, i: at.slider(key="map_year").set_value([1950, 2024][i % 2]),
+    "rolling_window": lambda at, i: at.slider(key="rolling_window").set_value([10, 30][i % 2]),
+}
+
+# Interaction name -> key of the st.fragment holding its widget
+FRAGMENTS = {
+    "trend_zones": "trend_comparison",
+    "single_zone": "single_zone_plot",
+    "growth_zones": "growth_comparison",
+    "map_year": "accumulation_map",
+    "rolling_window": "rolling_trends",
+}
+
+
+def require(label, obj, *names):
+    """Exit with a clear message when ``obj`` lacks one of the streamlit internals ``names``."""
+    missing = [name for name in names if not hasattr(obj, name)]
+    if missing:
+        raise SystemExit(
+            f"bench_app.py relies on streamlit internals missing in streamlit {streamlit.__version__}: "
+            f"{', '.join(f'{label}.{name}' for name in missing)}. It was written against streamlit "
+            f"{TESTED_STREAMLIT}; install that version or update FragmentScriptRunner."
+        )
+
+
+require("streamlit.testing.v1.app_test", app_test, "LocalScriptRunner")
+require("LocalScriptRunner", local_script_runner.LocalScriptRunner, "request_rerun")
+
+
+class FragmentScriptRunner(local_script_runner.LocalScriptRunner):
+    """Reruns only ``fragment_id`` when it is set, like a widget change inside a fragment."""
+
+    fragment_id = None
+    script_cache = ScriptCache()
+    created = False  # whether AppTest used this class, i.e. the swap below took effect
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        require("LocalScriptRunner", self, "_script_cache", "_requests")
+        FragmentScriptRunner.created = True
+        # The server compiles the script once; AppTest makes a new cache per run
+        self._script_cache = FragmentScriptRunner.script_cache
+
+    def request_rerun(self, rerun_data):
+        if FragmentScriptRunner.fragment_id is not None:
+            # The runner is created with a full rerun pending, which would
+            # absorb the fragment rerun; start from an empty request queue
+            self._requests = ScriptRequests()
+            rerun_data = dataclasses.replace(rerun_data, fragment_id_queue=[FragmentScriptRunner.fragment_id])
+        return super().request_rerun(rerun_data)
+
+
+app_test.LocalScriptRunner = FragmentScriptRunner
+
+
+def new_app():
+    at = AppTest.from_file(SCRIPT, default_timeout=300)
+    at.run()
+    if not FragmentScriptRunner.created:
+        raise SystemExit(
+            f"AppTest in streamlit {streamlit.__version__} no longer creates its runner through "
+            f"app_test.LocalScriptRunner; bench_app.py was written against streamlit {TESTED_STREAMLIT}."
+        )
+    return at
+
+
+def traced(run):
+    """Peak traced memory (KiB) and allocations still alive after one call of ``run``."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    run()
+    peak = tracemalloc.get_traced_memory()[1] / 1024
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    diff = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "lineno")
+    return peak, sum(stat.count_diff for stat in diff if stat.count_diff > 0)
+
+
+def measure(run, repeat):
+    """Median wall time (ms), then peak traced memory (KiB) and allocations of one traced run."""
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        run(i)
+        times.append((time.perf_counter() - start) * 1e3)
+    peak, allocations = traced(lambda: run(repeat))
+    return {"wall_ms": statistics.median(times), "peak_kib": peak, "allocations": allocations}
+
+
+def harness():
+    """Peak memory and allocations of rerunning a script that does nothing."""
+    at = AppTest.from_string("import streamlit as st", default_timeout=300)
+    at.run()
+    at.run()
+    return measure(lambda i: at.run(), 3)
+
+
+def run_suite(repeat, full_reruns=False):
+    os.chdir(ROOT)
+    results = {"new_session": measure(lambda i: new_app(), repeat)}
+    for name, change in INTERACTIONS.items():
+        # A fresh session per interaction: a fragment rerun only returns the
+        # fragment's elements, so the other widgets are gone from the tree
+        at = new_app()
+        fragment = FRAGMENTS.get(name)
+        fragment_id = None
+        if fragment is not None and not full_reruns:
+            require("AppTest", at, "_fragment_storage")
+            [fragment_id] = at._fragment_storage.resolve_target(fragment)
+
+        def interaction(i, at=at, change=change, fragment_id=fragment_id):
+            change(at, i)
+            FragmentScriptRunner.fragment_id = fragment_id
+            try:
+                at.run()
+            finally:
+                FragmentScriptRunner.fragment_id = None
+            if at.exception:
+                raise RuntimeError(f"{name} raised: {at.exception[0].message}")
+            if fragment_id is not None and not at.get("image"):
+                raise RuntimeError(f"{name}: the fragment rerun drew no image")
+        # Warm the caches with both values first
+        interaction(0)
+        interaction(1)
+        results[name] = measure(interaction, repeat)
+    base = harness()
+    for result in results.values():
+        result["peak_kib"] -= base["peak_kib"]
+        result["allocations"] -= base["allocations"]
+    return results, base
+
+
+def regressions(results, baseline, threshold, slack_ms, slack_kib, slack_allocations):
+    failed = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if current["wall_ms"] > base["wall_ms"] * (1 + threshold) + slack_ms:
+            failed.append(f"{name}: {current['wall_ms']:.1f} ms vs baseline {base['wall_ms']:.1f} ms")
+        if current["peak_kib"] > base["peak_kib"] * (1 + threshold) + slack_kib:
+            failed.append(f"{name}: peak {current['peak_kib']:.0f} KiB vs baseline {base['peak_kib']:.0f} KiB")
+        # Baselines recorded before allocations were counted do not have them
+        if "allocations" in base and current["allocations"] > base["allocations"] * (1 + threshold) + slack_allocations:
+            failed.append(f"{name}: {current['allocations']} allocations vs baseline {base['allocations']}")
+    return failed
+
+
+def _fmt(value, spec):
+    return "-" if value is None else format(value, spec)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative regression")
+    parser.add_argument("--slack-ms", type=float, default=10.0, help="allowed absolute regression in ms")
+    parser.add_argument("--slack-kib", type=float, default=64.0, help="allowed absolute regression in KiB")
+    parser.add_argument("--slack-allocations", type=int, default=200,
+                        help="allowed absolute regression in allocations")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--full-reruns", action="store_true", help="rerun the whole script on every change")
+    args = parser.parse_args()
+
+    results, base = run_suite(args.repeat, args.full_reruns)
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)["interactions"]
+
+    if streamlit.__version__ != TESTED_STREAMLIT:
+        print(f"streamlit {streamlit.__version__}, written against {TESTED_STREAMLIT}")
+    print(f"harness (subtracted): peak {base['peak_kib']:.0f} KiB, {base['allocations']} allocations")
+    print(f"{'interaction':>14} {'wall ms':>9} {'baseline':>9} {'peak KiB':>9} {'baseline':>9} "
+          f"{'allocations':>12} {'baseline':>9}")
+    for name, current in results.items():
+        known = baseline.get(name, {})
+        print(f"{name:>14} {current['wall_ms']:9.1f} {_fmt(known.get('wall_ms'), '.1f'):>9} "
+              f"{current['peak_kib']:9.0f} {_fmt(known.get('peak_kib'), '.0f'):>9} "
+              f"{current['allocations']:12d} {_fmt(known.get('allocations'), 'd'):>9}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({"machine": platform.platform(), "python": platform.python_version(),
+                       "streamlit": streamlit.__version__, "harness": base, "interactions": results}, f, indent=2)
+            f.write("\n")
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    failed = regressions(results, baseline, args.threshold, args.slack_ms, args.slack_kib, args.slack_allocations)
+    for line in failed:
+        print("REGRESSION", line, file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""Server cost of the multi-zone comparison charts for both backends, measured through the app.
+
+For each ZONAL_CHART_BACKEND, starts the dashboard as deployed (see
+bench_sessions), warms it with one page load, then opens a new
+websocket session that loads the page and toggles N zones of the Part I
+comparison chart. It reports the server process's CPU time and the bytes
+the browser receives for the page load and for the toggles: websocket
+messages plus the images it fetches from /media, each URL once, as the
+browser caches them.
+
+With matplotlib a toggle is a change of the ``trend_zones`` multiselect,
+sent as a rerun of its fragment. With Vega-Lite the page has no such
+widget: toggles are legend clicks handled in the browser and send nothing,
+so the session stays idle for as long as the matplotlib toggles took, and
+whatever the server does meanwhile is measured.
+
+    python benchmarks/bench_chart_backends.py [--toggles N]
+
+Linux only: CPU time is read from /proc.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import urllib.request
+
+import numpy as np
+import websockets
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bench_sessions import Session, free_port, start_server  # noqa: E402
+from zonal.charts import TRENDS_DEFAULT  # noqa: E402
+from zonal.data import load_zonal_annual  # noqa: E402
+from zonal.features import zone_columns  # noqa: E402
+from zonal.interactive import BACKENDS, MATPLOTLIB  # noqa: E402
+
+CSV = os.path.join(os.path.dirname(__file__), "..", "ZonAnn.Ts+dSST.csv")
+
+
+def toggles(zones, count, seed=0):
+    # Add or remove one zone at a time, never leaving the selection empty
+    rng = np.random.default_rng(seed)
+    selection = list(TRENDS_DEFAULT)
+    for _ in range(count):
+        zone = zones[rng.integers(len(zones))]
+        if zone in selection and len(selection) > 1:
+            selection.remove(zone)
+        elif zone not in selection:
+            selection.append(zone)
+        yield list(selection)
+
+
+def cpu_seconds(pid):
+    """User plus system CPU time of process ``pid``."""
+    with open(f"/proc/{pid}/stat") as f:
+        # The fields after the parenthesized command name; utime and stime are the 12th and 13th
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+class Counted:
+    """A session's websocket, counting the bytes the server sends it.
+
+    Images arrive as /media URLs, which are fetched like the browser does.
+    """
+
+    def __init__(self, ws, http):
+        self.ws = ws
+        self.http = http
+        self.received = 0
+        self.media = set()
+
+    async def send(self, data):
+        await self.ws.send(data)
+
+    async def recv(self):
+        data = await self.ws.recv()
+        self.received += len(data)
+        forward = ForwardMsg()
+        forward.ParseFromString(data)
+        if forward.WhichOneof("type") == "delta" and forward.delta.WhichOneof("type") == "new_element":
+            element = forward.delta.new_element
+            if element.WhichOneof("type") == "imgs":
+                for image in element.imgs.imgs:
+                    if image.url not in self.media:
+                        self.media.add(image.url)
+                        with urllib.request.urlopen(self.http + image.url) as response:
+                            self.received += len(response.read())
+        return data
+
+
+class Cost:
+    """Server CPU time and bytes received between two points of a session."""
+
+    def __init__(self, pid, connection):
+        self.pid, self.connection = pid, connection
+        self.cpu, self.received = cpu_seconds(pid), connection.received
+
+    def stop(self):
+        return cpu_seconds(self.pid) - self.cpu, self.connection.received - self.received
+
+
+async def measure(port, pid, selections, idle):
+    """Load the page and toggle zones in one new session; return the load cost and the toggle cost."""
+    http = f"http://localhost:{port}"
+    url = f"ws://localhost:{port}/_stcore/stream"
+    async with websockets.connect(url, subprotocols=["streamlit"], max_size=None) as ws:
+        await Session(Counted(ws, http)).rerun()
+    async with websockets.connect(url, subprotocols=["streamlit"], max_size=None) as ws:
+        connection = Counted(ws, http)
+        session = Session(connection)
+        cost = Cost(pid, connection)
+        await session.rerun()
+        load = cost.stop()
+
+        start = time.perf_counter()
+        cost = Cost(pid, connection)
+        if "trend_zones" in session.widgets:
+            widget_id, fragment_id = session.widgets["trend_zones"]
+            for selection in selections:
+                state = WidgetState(id=widget_id)
+                state.string_array_value.data.extend(selection)
+                session.states[widget_id] = state
+                await session.rerun(fragment_id)
+        else:
+            # Nothing to send: the chart reacts in the browser
+            await asyncio.sleep(idle)
+        interactions = cost.stop()
+    return load, interactions, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--toggles", type=int, default=30, help="zone toggles per session")
+    args = parser.parse_args()
+    raw = load_zonal_annual(CSV)
+    selections = list(toggles(zone_columns(raw), args.toggles))
+
+    print(f"{'backend':>10} {'load ms CPU':>12} {'load KiB':>9} {'toggles ms CPU':>15} {'toggles KiB':>12} "
+          f"{'per toggle':>18}")
+    # matplotlib first: the Vega-Lite session idles as long as its toggles took
+    idle = 0.0
+    for backend in sorted(BACKENDS, key=lambda backend: backend != MATPLOTLIB):
+        port = free_port()
+        server = start_server(port, backend)
+        try:
+            load, interactions, elapsed = asyncio.run(measure(port, server.pid, selections, idle))
+        finally:
+            server.terminate()
+            server.wait()
+        idle = idle or elapsed
+        per_cpu, per_kib = interactions[0] / len(selections) * 1e3, interactions[1] / len(selections) / 1024
+        print(f"{backend:>10} {load[0] * 1e3:12.0f} {load[1] / 1024:9.1f} {interactions[0] * 1e3:15.0f} "
+              f"{interactions[1] / 1024:12.1f} {per_cpu:6.1f} ms {per_kib:6.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
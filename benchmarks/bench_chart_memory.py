@@ -0,0 +1,73 @@
+"""Memory growth of the app over many reruns.
+
+Drives the app headlessly with streamlit's AppTest, cycling the single-zone
+selectbox and the two multiselects through a few selections, and reports the
+process RSS after a warm-up and after the last rerun. Exits non-zero when
+memory keeps growing past ``--max-growth-mb`` or when matplotlib figures are
+left open.
+
+    python benchmarks/bench_chart_memory.py [--reruns 1000]
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+
+import matplotlib.pyplot as plt
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SCRIPT = os.path.join(ROOT, "Miniproject_JIANG_Streamlit.py")
+
+SELECTIONS = [
+    ["Glob", "90S-64S", "64N-90N"],
+    ["Glob"],
+    ["NHem", "SHem"],
+    ["64N-90N", "44N-64N", "24N-44N"],
+]
+ZONES = ["Glob", "NHem", "SHem", "64N-90N", "90S-64S"]
+
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reruns", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--max-growth-mb", type=float, default=25.0)
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    at = AppTest.from_file(SCRIPT, default_timeout=300)
+    at.run()
+    start = time.perf_counter()
+    warm_rss = None
+    for i in range(args.reruns):
+        at.multiselect[0].set_value(SELECTIONS[i % len(SELECTIONS)])
+        at.multiselect[1].set_value([f"{col}_diff" for col in SELECTIONS[(i + 1) % len(SELECTIONS)]])
+        at.selectbox[0].set_value(ZONES[i % len(ZONES)])
+        at.run()
+        if at.exception:
+            sys.exit(f"rerun {i} raised: {at.exception[0].message}")
+        if i + 1 == args.warmup:
+            gc.collect()
+            warm_rss = rss_mb()
+    gc.collect()
+    final_rss = rss_mb()
+    elapsed = time.perf_counter() - start
+
+    growth = final_rss - warm_rss
+    print(f"{args.reruns} reruns in {elapsed:.1f} s ({elapsed / args.reruns * 1e3:.0f} ms each)")
+    print(f"RSS after {args.warmup} reruns: {warm_rss:.1f} MB, after {args.reruns}: {final_rss:.1f} MB "
+          f"(growth {growth:+.1f} MB)")
+    print(f"open pyplot figures: {len(plt.get_fignums())}")
+    if growth > args.max_growth_mb or plt.get_fignums():
+        sys.exit("memory keeps growing across reruns")
+
+
+if __name__ == "__main__":
+    main()
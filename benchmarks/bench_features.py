@@ -0,0 +1,67 @@
+"""Compare the vectorized feature builder with the original per-column pandas code.
+
+Checks that both produce the same numbers, then reports time per rerun and the
+memory held by the resulting frames.
+
+    python benchmarks/bench_features.py
+"""
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from zonal.data import load_zonal_annual  # noqa: E402
+from zonal.features import build_features, compute_blocks, frame_from_blocks, zone_columns  # noqa: E402
+
+CSV = os.path.join(os.path.dirname(__file__), "..", "ZonAnn.Ts+dSST.csv")
+
+
+def reference(df):
+    # The app's original code, one inserted column at a time
+    df = df.copy()
+    latitudinal_columns = df.columns[1:]
+    for col in latitudinal_columns:
+        df[f"{col}_diff"] = df[col].diff()
+    diff_columns = [col for col in df.columns if "_diff" in col]
+    for col in diff_columns:
+        df[f"{col.replace('_diff', '_accum')}"] = df[col].cumsum()
+    return df
+
+
+def vectorized(df):
+    return frame_from_blocks(df["Year"], compute_blocks(df), zone_columns(df))
+
+
+def check_equivalence(df):
+    expected = reference(df)
+    actual = vectorized(df)
+    assert actual.columns.tolist() == expected.columns.tolist()
+    assert np.array_equal(actual["Year"].to_numpy(), expected["Year"].to_numpy())
+    # float64 results must agree exactly once rounded to the stored float32
+    np.testing.assert_array_equal(
+        actual.iloc[:, 1:].to_numpy(),
+        expected.iloc[:, 1:].to_numpy(dtype=np.float64).astype(np.float32),
+    )
+
+
+def main():
+    df = load_zonal_annual(CSV)
+    check_equivalence(df)
+    print("equivalence: OK")
+
+    number = 200
+    for name, func in [("pandas per-column", reference), ("vectorized", vectorized),
+                       ("vectorized, cached", build_features)]:
+        seconds = min(timeit.repeat(lambda: func(df), number=number, repeat=5)) / number
+        print(f"{name:>20}: {seconds * 1e3:8.3f} ms per rerun")
+
+    old = reference(df).memory_usage(deep=True).sum()
+    new = build_features(df).memory_usage(deep=True).sum()
+    print(f"memory: {old / 1024:.1f} KiB -> {new / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""Check and time the incremental feature update for appended and revised years.
+
+First a randomized property check: for random tables (with missing values),
+random trailing revisions and random appended rows, the features updated
+from the previous version must be bit-identical to a full recompute, and
+the reported Update (first changed year, appended rows, changed columns)
+must match a brute-force comparison.
+
+Then, on the real table, it times a full recompute against the incremental
+update and counts the charts and map frames each kind of update lets the
+app keep.
+
+    python benchmarks/bench_incremental.py [--cases N] [--seed S]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import timeit
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from zonal import features  # noqa: E402
+from zonal.charts import PART1_EXTRATROPICS, PART1_NORTH, PART2_EXTRATROPICS, PART2_NORTH, render_chart  # noqa: E402
+from zonal.data import load_zonal_annual  # noqa: E402
+from zonal.features import build_features, compute_blocks, frame_from_blocks, update_of, zone_columns  # noqa: E402
+from zonal.map_frames import build_frames, map_frame  # noqa: E402
+
+CSV = os.path.join(os.path.dirname(__file__), "..", "ZonAnn.Ts+dSST.csv")
+
+
+def versioned(df, version, previous=None):
+    df = df.copy()
+    df.attrs["data_version"] = version
+    if previous is not None:
+        df.attrs["previous_version"] = previous
+    return df
+
+
+def random_table(rng, rows, zones):
+    values = rng.normal(0, 1, size=(rows, zones)).round(rng.integers(1, 4))
+    values[rng.random(values.shape) < 0.1] = np.nan
+    df = pd.DataFrame(values, columns=[f"Z{i}" for i in range(zones)])
+    df.insert(0, "Year", np.arange(1880, 1880 + rows))
+    return df
+
+
+def random_update(rng, df):
+    """Revise some trailing rows and append some new ones."""
+    new = random_table(rng, len(df) + int(rng.integers(0, 5)), df.shape[1] - 1)
+    keep = int(rng.integers(1, len(df) + 1))
+    new.iloc[:keep] = df.iloc[:keep].to_numpy()
+    # Some revisions put back the old value, or only touch some zones
+    for row in range(keep, len(df)):
+        mask = rng.random(df.shape[1] - 1) < 0.5
+        new.iloc[row, 1:] = np.where(mask, df.iloc[row, 1:], new.iloc[row, 1:])
+    return new
+
+
+def bits(array):
+    # Compare the raw bits, so NaNs and signed zeros must match too
+    return np.ascontiguousarray(array).view(f"u{array.dtype.itemsize}")
+
+
+def expected_update(old, new, previous):
+    full_old, full_new = compute_blocks(old), compute_blocks(new)
+    n = len(old)
+    zones = zone_columns(new)
+    changed_rows = [i for i in range(n) if not np.array_equal(old.iloc[i].to_numpy(), new.iloc[i].to_numpy(),
+                                                              equal_nan=True)]
+    first = changed_rows[0] if changed_rows else n
+    if first == n and len(new) == n:
+        first_year = int(new["Year"].iloc[-1]) + 1
+    else:
+        first_year = int(new["Year"].iloc[first])
+    columns = set()
+    for suffix in full_new:
+        for j, zone in enumerate(zones):
+            if len(new) > n or not np.array_equal(full_old[suffix][:, j], full_new[suffix][:n, j], equal_nan=True):
+                columns.add(f"{zone}{suffix}")
+    return features.Update(previous, first_year, len(new) - n, frozenset(columns))
+
+
+def check_property(cases, seed):
+    rng = np.random.default_rng(seed)
+    for case in range(cases):
+        old = random_table(rng, int(rng.integers(1, 60)), int(rng.integers(1, 6)))
+        new = random_update(rng, old)
+        old_version, new_version = f"old{case}", f"new{case}"
+        build_features(versioned(old, old_version))
+        updated = build_features(versioned(new, new_version, old_version))
+        full = frame_from_blocks(new["Year"], compute_blocks(new), zone_columns(new))
+        assert updated.columns.tolist() == full.columns.tolist()
+        for column in full.columns:
+            assert np.array_equal(bits(updated[column].to_numpy()), bits(full[column].to_numpy())), (case, column)
+        with features._lock:
+            blocks = features._cache[new_version][1]
+        for suffix, block in compute_blocks(new).items():
+            assert np.array_equal(bits(blocks[suffix]), bits(block)), (case, suffix)
+        expected = expected_update(old, new, old_version)
+        actual = update_of(updated)
+        if expected.first_year > int(old["Year"].iloc[0]):
+            assert actual == expected, (case, actual, expected)
+        else:
+            # A change in the first row is a full recompute
+            assert actual is None, (case, actual)
+    print(f"property: {cases} random updates bit-identical to a full recompute")
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - start) * 1e3
+
+
+def best_ms(func, number=200):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e3
+
+
+def uncached_update(df):
+    # build_features caches per version; drop the entry to time the update itself
+    version = df.attrs["data_version"]
+    with features._lock:
+        features._cache.pop(version, None)
+        features._updates.pop(version, None)
+    return build_features(df)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cases", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    check_property(args.cases, args.seed)
+
+    raw = load_zonal_annual(CSV).copy()
+    base = raw.iloc[:-1]
+    appended = raw
+    revised = raw.copy()
+    revised.loc[revised.index[-1], "64N-90N"] += 0.01
+    specs = [PART1_EXTRATROPICS, PART1_NORTH, PART2_EXTRATROPICS, PART2_NORTH]
+
+    cache = tempfile.mkdtemp()
+    os.environ["ZONAL_CACHE_DIR"] = cache
+    try:
+        print(f"\n{'update':>22} {'features ms':>12} {'full ms':>8} {'charts kept':>12} {'frames kept':>12}")
+        for name, previous, current in [("append one year", base, appended), ("revise 64N-90N 2024", appended, revised)]:
+            old_df = build_features(versioned(previous, f"{name}-old"))
+            for spec in specs:
+                render_chart(old_df, spec)
+            build_frames(old_df, CSV)
+            new_raw = versioned(current, f"{name}-new", f"{name}-old")
+            inc_ms = best_ms(lambda: uncached_update(new_raw))
+            full_ms = best_ms(lambda: frame_from_blocks(current["Year"], compute_blocks(current), zone_columns(current)))
+            new_df = build_features(new_raw)
+            _, chart_ms = timed(lambda: [render_chart(new_df, spec) for spec in specs])
+            years = new_df["Year"].tolist()
+            _, frame_ms = timed(lambda: [map_frame(new_df, year, CSV) for year in years])
+            update = update_of(new_df)
+            charts_kept = sum(not (update.appended or update.columns.intersection(spec.columns)) for spec in specs)
+            frames_kept = sum(year < update.first_year for year in years)
+            print(f"{name:>22} {inc_ms:12.2f} {full_ms:8.2f} {charts_kept:>5}/{len(specs)} {chart_ms:5.0f}ms"
+                  f" {frames_kept:>5}/{len(years)} {frame_ms:5.0f}ms")
+    finally:
+        shutil.rmtree(cache)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Throughput and peak memory of the gridded ingest for growing inputs.
+
+Generates synthetic anomaly grids of increasing resolution in a temporary
+directory and reports ingest time and the peak of Python-allocated memory
+(memory-mapped input pages are not counted: they are backed by the file).
+The peak should stay flat while the input grows.
+
+    python benchmarks/bench_ingest.py [--years 145] [--resolutions 4 2 1]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from zonal import ingest, synthetic  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, default=145)
+    parser.add_argument("--resolutions", type=float, nargs="+", default=[4, 2, 1],
+                        help="grid spacing in degrees")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for degrees in args.resolutions:
+            nlat, nlon = int(180 / degrees), int(360 / degrees)
+            path = os.path.join(tmp, f"grid-{degrees}.npy")
+            synthetic.write_grid(path, args.years, nlat, nlon)
+            size = os.path.getsize(path) / 2**20
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            df = ingest.load_grid(path)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] / 2**20
+            tracemalloc.stop()
+            print(f"{degrees:4g}° grid ({args.years * 12} x {nlat} x {nlon}, {size:7.0f} MiB): "
+                  f"{elapsed:6.2f} s, {size / elapsed:6.0f} MiB/s, peak {peak:6.1f} MiB -> {df.shape}")
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Cold-build time of the map frame cache and per-frame serve latency.
+
+Builds every year's frame into a temporary cache directory with an
+increasing number of worker processes, then times serving frames from disk
+and from memory against rendering them on demand.
+
+    python benchmarks/bench_map_frames.py [--workers 1 2 4]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+CSV = os.path.join(os.path.dirname(__file__), "..", "ZonAnn.Ts+dSST.csv")
+
+
+def percentiles(samples):
+    ms = np.array(samples) * 1e3
+    return f"p50 {np.percentile(ms, 50):7.2f} ms   p95 {np.percentile(ms, 95):7.2f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["ZONAL_CACHE_DIR"] = tmp
+        from zonal import map_frames
+        from zonal.data import load_zonal_annual
+        from zonal.features import build_features
+        from zonal.maps import band_table, render_map
+
+        df = build_features(load_zonal_annual(CSV))
+        years = df["Year"].tolist()
+
+        print(f"cold build of {len(years)} frames")
+        for workers in args.workers:
+            directory = map_frames.frame_dir(df, CSV)
+            for name in os.listdir(directory) if os.path.isdir(directory) else []:
+                os.remove(os.path.join(directory, name))
+            start = time.perf_counter()
+            map_frames.build_frames(df, CSV, workers=workers)
+            print(f"  {workers:2d} workers: {time.perf_counter() - start:6.2f} s")
+
+        def timed(func):
+            samples = []
+            for year in years:
+                start = time.perf_counter()
+                func(year)
+                samples.append(time.perf_counter() - start)
+            return samples
+
+        print("per-frame latency")
+        print("  render on demand: ", percentiles(timed(lambda year: render_map(band_table(df, year)))))
+        map_frames._frames.clear()
+        print("  serve from disk:  ", percentiles(timed(lambda year: map_frames.map_frame(df, year, CSV))))
+        print("  serve from memory:", percentiles(timed(lambda year: map_frames.map_frame(df, year, CSV))))
+
+
+if __name__ == "__main__":
+    main()
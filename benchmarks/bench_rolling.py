@@ -0,0 +1,90 @@
+"""Check and time the prefix-sum rolling statistics against refitting each window.
+
+For random tables with missing values and every window length, the slopes,
+means and volatilities from zonal.rolling must match a per-window
+``np.polyfit`` and residual standard deviation to within float64 rounding.
+Then, on the real table, it times both approaches for every window length
+the app offers, and a cached lookup.
+
+    python benchmarks/bench_rolling.py [--cases N] [--seed S]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from zonal import rolling  # noqa: E402
+from zonal.data import load_zonal_annual  # noqa: E402
+from zonal.features import zone_columns  # noqa: E402
+from zonal.rolling import MAX_WINDOW, MIN_WINDOW, rolling_trends, window_statistics  # noqa: E402
+
+CSV = os.path.join(os.path.dirname(__file__), "..", "ZonAnn.Ts+dSST.csv")
+
+
+def refit(values, window):
+    """The same statistics, fitting every window separately."""
+    n, zones = values.shape
+    out = np.full((3, n, zones), np.nan)
+    t = np.arange(window, dtype=np.float64)
+    for end in range(window - 1, n):
+        for j in range(zones):
+            y = values[end - window + 1:end + 1, j]
+            if window < 3 or np.isnan(y).any():
+                continue
+            slope, intercept = np.polyfit(t, y, 1)
+            residual = y - (slope * t + intercept)
+            out[:, end, j] = slope, y.mean(), np.sqrt((residual ** 2).sum() / (window - 2))
+    return out
+
+
+def check_property(cases, seed):
+    rng = np.random.default_rng(seed)
+    for case in range(cases):
+        rows, zones = int(rng.integers(1, 80)), int(rng.integers(1, 5))
+        values = rng.normal(0, 1, size=(rows, zones)) + rng.normal(0, 0.05) * np.arange(rows)[:, None]
+        values[rng.random(values.shape) < 0.02] = np.nan
+        window = int(rng.integers(1, rows + 2))
+        fast, slow = window_statistics(values, window), refit(values, window)
+        assert np.array_equal(np.isnan(fast), np.isnan(slow)), (case, window)
+        assert np.allclose(fast, slow, rtol=1e-9, atol=1e-9, equal_nan=True), (case, window)
+    print(f"property: {cases} random tables match a per-window refit")
+
+
+def best_ms(func, number=5):
+    return min(timeit.repeat(func, number=number, repeat=3)) / number * 1e3
+
+
+def uncached(df, window):
+    # rolling_trends caches per version and window; drop the entries to time the computation
+    with rolling._lock:
+        rolling._cache.clear()
+    return rolling_trends(df, window)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cases", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    check_property(args.cases, args.seed)
+
+    raw = load_zonal_annual(CSV)
+    values = raw[zone_columns(raw)].to_numpy(dtype=np.float64)
+    windows = range(MIN_WINDOW, MAX_WINDOW + 1)
+    prefix_ms = best_ms(lambda: [window_statistics(values, w) for w in windows])
+    refit_ms = best_ms(lambda: [refit(values, w) for w in windows], number=1)
+    print(f"\n{len(windows)} windows x {values.shape[1]} zones x {values.shape[0]} years")
+    print(f"{'prefix sums':>12} {prefix_ms:9.2f} ms")
+    print(f"{'refit':>12} {refit_ms:9.2f} ms  ({refit_ms / prefix_ms:.0f}x)")
+
+    first_ms = best_ms(lambda: uncached(raw, 30), number=100)
+    cached_ms = best_ms(lambda: rolling_trends(raw, 30), number=1000)
+    print(f"rolling_trends(window=30): first {first_ms:.3f} ms, cached {cached_ms * 1e3:.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Load test: server memory and rerun latency as concurrent sessions grow.
+
+Starts the dashboard as deployed (``python -m zonal.serve``) and opens N
+websocket sessions at once, the way N browser tabs would. Each session loads
+the page, then changes its widgets in turn (both multiselects, the
+single-zone selectbox, the year slider and the rolling window slider). Like
+the browser, it sends each change as a rerun of the widget's fragment.
+Latency is the time from sending a rerun to the server's "script finished"
+message, and RSS is the resident memory of the server process while all N
+sessions are connected.
+
+One session first runs every interaction, so the shared caches are warm.
+Growth beyond that comes from per-session state.
+
+    python benchmarks/bench_sessions.py [--levels 1,4,16,32] [--interactions 20]
+
+Linux only: RSS is read from /proc.
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Widget key -> (WidgetState value field, the two values a session alternates between)
+CHANGES = {
+    "trend_zones": ("string_array_value", [["Glob", "90S-64S", "64N-90N"], ["NHem", "SHem"]]),
+    "single_zone": ("string_value", ["Glob", "64N-90N"]),
+    "growth_zones": ("string_array_value", [["64N-90N_diff", "90S-64S_diff"], ["Glob_diff"]]),
+    "map_year": ("double_array_value", [[1950], [2024]]),
+    "rolling_window": ("double_array_value", [[10], [30]]),
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port, backend="matplotlib"):
+    env = dict(os.environ, ZONAL_CHART_BACKEND=backend)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "zonal.serve", "--server.headless", "true",
+         "--server.port", str(port), "--browser.gatherUsageStats", "false"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://localhost:{port}/_stcore/health") as response:
+                if response.read() == b"ok":
+                    return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("the streamlit server did not start")
+
+
+def rss_mib(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+class Session:
+    def __init__(self, ws):
+        self.ws = ws
+        self.widgets = {}  # widget key -> (widget id, fragment id)
+        self.states = {}   # widget id -> WidgetState sent with every rerun
+
+    async def rerun(self, fragment_id=""):
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.page_script_hash = ""
+        msg.rerun_script.fragment_id = fragment_id
+        msg.rerun_script.widget_states.widgets.extend(self.states.values())
+        start = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(await self.ws.recv())
+            kind = forward.WhichOneof("type")
+            if kind == "script_finished":
+                return (time.perf_counter() - start) * 1e3
+            if kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                element = forward.delta.new_element
+                widget = getattr(element, element.WhichOneof("type"))
+                widget_id = getattr(widget, "id", "")
+                for key in CHANGES:
+                    if widget_id.endswith(f"-{key}"):
+                        self.widgets[key] = (widget_id, forward.delta.fragment_id)
+
+    async def change(self, key, i):
+        field, values = CHANGES[key]
+        widget_id, fragment_id = self.widgets[key]
+        state = WidgetState(id=widget_id)
+        value = values[i % 2]
+        if field == "string_value":
+            state.string_value = value
+        else:
+            getattr(state, field).data.extend(value)
+        self.states[widget_id] = state
+        return await self.rerun(fragment_id)
+
+
+async def run_session(ws, interactions, latencies):
+    session = Session(ws)
+    latencies["load"].append(await session.rerun())
+    keys = list(CHANGES)
+    for i in range(interactions):
+        key = keys[i % len(keys)]
+        latencies["interaction"].append(await session.change(key, i // len(keys)))
+
+
+async def run_level(url, sessions, interactions, pid):
+    """Run ``sessions`` sessions at once; return their latencies and the server RSS."""
+    latencies = {"load": [], "interaction": []}
+    async with contextlib.AsyncExitStack() as stack:
+        connections = [
+            await stack.enter_async_context(websockets.connect(url, subprotocols=["streamlit"], max_size=None))
+            for _ in range(sessions)
+        ]
+        await asyncio.gather(*(run_session(ws, interactions, latencies) for ws in connections))
+        # Every session is still connected
+        rss = rss_mib(pid)
+    return latencies, rss
+
+
+def p95(values):
+    return statistics.quantiles(values, n=20)[-1] if len(values) > 1 else values[0]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--levels", default="1,4,16,32", help="comma-separated session counts")
+    parser.add_argument("--interactions", type=int, default=20, help="widget changes per session")
+    args = parser.parse_args()
+    levels = [int(level) for level in args.levels.split(",")]
+
+    port = free_port()
+    server = start_server(port)
+    url = f"ws://localhost:{port}/_stcore/stream"
+    try:
+        asyncio.run(run_level(url, 1, 2 * len(CHANGES), server.pid))
+        baseline = rss_mib(server.pid)
+        print(f"server RSS after one warm session: {baseline:.0f} MiB")
+        print(f"{'sessions':>8} {'RSS MiB':>8} {'+MiB':>6} {'load p50':>9} {'load p95':>9} "
+              f"{'rerun p50':>10} {'rerun p95':>10}")
+        for sessions in levels:
+            latencies, rss = asyncio.run(run_level(url, sessions, args.interactions, server.pid))
+            load, rerun = latencies["load"], latencies["interaction"]
+            print(f"{sessions:8d} {rss:8.0f} {rss - baseline:6.0f} {statistics.median(load):9.0f} "
+                  f"{p95(load):9.0f} {statistics.median(rerun):10.0f} {p95(rerun):10.0f}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
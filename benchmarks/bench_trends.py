@@ -0,0 +1,84 @@
+"""Batched trend fitting against the notebook's per-zone sklearn/statsmodels path.
+
+Checks that the batched fits match statsmodels' OLS for every zone and model,
+then times both paths and the bootstrap intervals for several worker counts.
+Needs scikit-learn and statsmodels (the notebook's dependencies).
+
+    python benchmarks/bench_trends.py [--replicates 2000] [--workers 1 2 4]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import statsmodels.api as sm
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import r2_score
+from sklearn.preprocessing import PolynomialFeatures
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from zonal.data import load_zonal_annual  # noqa: E402
+from zonal.features import build_features, derived_columns  # noqa: E402
+from zonal.trends import bootstrap_intervals, fit_models  # noqa: E402
+
+CSV = os.path.join(os.path.dirname(__file__), "..", "ZonAnn.Ts+dSST.csv")
+
+
+def per_zone(df, columns):
+    # The notebook's code, repeated for every zone and model
+    results = {}
+    X = df[["Year"]].astype(float)
+    for col in columns:
+        y = df[col].astype(float).fillna(0)
+        for model, degree in [("linear", 1), ("quadratic", 2)]:
+            X_poly = PolynomialFeatures(degree=degree, include_bias=False).fit_transform(X)
+            r2_score(y, LinearRegression().fit(X_poly, y).predict(X_poly))
+            results[col, model] = sm.OLS(y, sm.add_constant(X_poly)).fit()
+        shift = abs(y.min()) + 1e-5
+        X_const = sm.add_constant(X)
+        fit = sm.OLS(np.log(y + shift), X_const).fit()
+        r2_score(y, np.exp(fit.predict(X_const)) - shift)
+        results[col, "exponential"] = fit
+    return results
+
+
+def check_against_statsmodels(table, reference):
+    for (col, model), fit in reference.items():
+        rows = table[(table["Zone"] == col) & (table["Model"] == model)]
+        np.testing.assert_allclose(rows["Coefficient"], fit.params, rtol=1e-6)
+        np.testing.assert_allclose(rows["Std_Error"], fit.bse, rtol=1e-6)
+        np.testing.assert_allclose(rows["P_Value"], fit.pvalues, rtol=1e-4, atol=1e-300)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--replicates", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    raw = load_zonal_annual(CSV)
+    df = build_features(raw)
+    columns = derived_columns(raw, "_accum")
+    years, y = df["Year"], df[columns]
+
+    start = time.perf_counter()
+    reference = per_zone(df, columns)
+    loop = time.perf_counter() - start
+
+    start = time.perf_counter()
+    table = fit_models(years, y, columns)
+    batched = time.perf_counter() - start
+    check_against_statsmodels(table, reference)
+    print(f"{len(columns)} zones x 3 models: sklearn/statsmodels per zone {loop * 1e3:7.1f} ms, "
+          f"batched {batched * 1e3:6.2f} ms (results match statsmodels)")
+
+    for workers in args.workers:
+        start = time.perf_counter()
+        bootstrap_intervals(df, columns, "quadratic", args.replicates, workers=workers)
+        print(f"bootstrap, {args.replicates} replicates, {workers} worker(s): {time.perf_counter() - start:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
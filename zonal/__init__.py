@@ -0,0 +1 @@
+"""Helpers behind the Streamlit app: data loading, derived features and rendering."""
@@ -0,0 +1,231 @@
+"""Chart definitions and a cache of their rendered images.
+
+Each line chart of the app is described by a ChartSpec (columns, labels,
+title, style). Rendering a spec produces the PNG bytes st.pyplot would have
+produced, and the bytes are memoized per data version and spec, so charts
+whose inputs did not change cost nothing on rerun. Figures are created
+without pyplot, so they never enter its global figure registry, and each one
+is cleared as soon as its image is saved.
+"""
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import matplotlib
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from PIL import Image
+
+from zonal import instrument
+from zonal.features import update_of
+from zonal.rolling import STATISTICS
+
+# Same output as st.pyplot
+DPI = 200
+
+# st.image downsizes (and re-encodes) anything wider than this on every call,
+# so cached images are stored at most this wide
+MAX_WIDTH = 2 * 730
+
+# Rendered images kept per process; a chart is ~50-100 KB
+CACHE_SIZE = 128
+
+# Bump when draw_chart or the way images are saved changes
+CHART_REVISION = 1
+
+# Digest of the renderer and the settings above that a chart image depends
+# on, besides its ChartSpec and data; stored charts (zonal.report) are keyed by it
+STYLE_VERSION = hashlib.sha256(repr((
+    matplotlib.__version__, CHART_REVISION, DPI, MAX_WIDTH,
+)).encode()).hexdigest()[:16]
+
+
+@dataclass(frozen=True)
+class ChartSpec:
+    columns: Tuple[str, ...]
+    title: str
+    ylabel: str
+    labels: Optional[Tuple[str, ...]] = None  # legend entries, default to the column names
+    xlabel: str = "Year"
+    figsize: Tuple[float, float] = (10, 6)
+    markers: bool = False
+    grid: bool = False
+    legend: bool = True
+
+
+# First graph of Part I
+PART1_EXTRATROPICS = ChartSpec(
+    columns=("24N-90N", "24S-24N", "90S-24S"),
+    labels=("Northern Extratropics Zone", "Tropical and Subtropical Zone", "Southern Extratropics Zone"),
+    title="Latitudinal Zones Comparison Over Time",
+    ylabel="Yearly Average Temperature",
+    figsize=(8, 5), markers=True, grid=True,
+)
+
+# Second graph of Part I
+PART1_NORTH = ChartSpec(
+    columns=("64N-90N", "44N-64N", "24N-44N", "EQU-24N"),
+    labels=("Northern Polar Zone", "Northern Temperate Zone", "Northern Subtropical Zone", "Northern Tropical Zone"),
+    title="North Hemisphere Comparison Over Time",
+    ylabel="Yearly Average Temperature",
+    figsize=(8, 5), markers=True, grid=True,
+)
+
+# First graph of Part II
+PART2_EXTRATROPICS = ChartSpec(
+    columns=("24N-90N_diff", "24S-24N_diff", "90S-24S_diff"),
+    labels=PART1_EXTRATROPICS.labels,
+    title="Three Large Latitudinal Zones Temperature Growth Comparison Over Time",
+    ylabel="Yearly Average Temperature Change",
+    figsize=(8, 5), markers=True, grid=True,
+)
+
+# Second graph of Part II
+PART2_NORTH = ChartSpec(
+    columns=("64N-90N_diff", "44N-64N_diff", "24N-44N_diff", "EQU-24N_diff"),
+    labels=PART1_NORTH.labels,
+    title="North Hemisphere Temperature Growth Comparison Over Time",
+    ylabel="Yearly Average Temperature Change",
+    figsize=(8, 5), markers=True, grid=True,
+)
+
+# Defaults of the multiselects
+TRENDS_DEFAULT = ["Glob", "90S-64S", "64N-90N"]
+GROWTH_DEFAULT = ["64N-90N_diff", "90S-64S_diff"]
+ROLLING_DEFAULT = ["Glob", "64N-90N"]
+
+
+def trends_spec(columns):
+    """Part I multi-zone comparison."""
+    return ChartSpec(
+        columns=tuple(columns),
+        title="Various Latitudinal Zones Temperature Trends Comparison Over Time",
+        ylabel="Temperature",
+    )
+
+
+def growth_spec(columns):
+    """Part II multi-zone comparison."""
+    return ChartSpec(
+        columns=tuple(columns),
+        title="Various Latitudinal Zones Temperature Growth Comparison Over Time",
+        ylabel="Temperature/Yearly Average Temperature Change",
+    )
+
+
+def rolling_spec(zones, window, suffix):
+    """Rolling-window statistic ``suffix`` (see zonal.rolling.STATISTICS) of ``zones``."""
+    return ChartSpec(
+        columns=tuple(f"{zone}{suffix}" for zone in zones),
+        labels=tuple(zones),
+        title=f"{window}-Year Rolling {STATISTICS[suffix].split(' (')[0]} by Latitudinal Zone",
+        ylabel=STATISTICS[suffix],
+        xlabel="Last Year of the Window",
+        grid=True,
+    )
+
+
+def single_zone_spec(column):
+    """Bonus single-zone plot."""
+    return ChartSpec(
+        columns=(column,),
+        title=f"{column} over Time",
+        ylabel="Temperature",
+        legend=False,
+    )
+
+
+_lock = threading.Lock()
+_images = OrderedDict()  # (data version, spec) -> PNG bytes
+
+
+@contextmanager
+def _figure(figsize):
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    try:
+        yield fig
+    finally:
+        fig.clear()
+
+
+def draw_chart(fig, df, spec):
+    """Draw ``spec`` from the columns of ``df`` onto the Figure ``fig``."""
+    ax = fig.subplots()
+    style = {"marker": "o", "ms": 1} if spec.markers else {}
+    labels = spec.labels or spec.columns
+    for col, label in zip(spec.columns, labels):
+        ax.plot(df["Year"], df[col], label=label, **style)
+    ax.set_title(spec.title)
+    ax.set_xlabel(spec.xlabel)
+    ax.set_ylabel(spec.ylabel)
+    if spec.grid:
+        ax.grid(True, linestyle="--", alpha=0.7)
+    if spec.legend:
+        ax.legend()
+    return ax
+
+
+def render_png(df, spec):
+    """Render ``spec`` to PNG bytes without using the cache."""
+    with _figure(spec.figsize) as fig:
+        draw_chart(fig, df, spec)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", dpi=DPI, bbox_inches="tight")
+    return fit_width(buffer.getvalue())
+
+
+def fit_width(png, max_width=MAX_WIDTH):
+    """Downsize ``png`` to ``max_width`` pixels, the way st.image would."""
+    image = Image.open(io.BytesIO(png))
+    if image.width <= max_width:
+        return png
+    height = int(1.0 * image.height * max_width / image.width)
+    buffer = io.BytesIO()
+    image.resize((max_width, height), resample=Image.BILINEAR).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def render_chart(df, spec):
+    """Return the PNG bytes of ``spec``, rendering it only if it is not cached.
+
+    ``df`` must carry ``attrs["data_version"]`` (as the frames from
+    zonal.features do); without it the chart is rendered every time.
+    """
+    with instrument.section("render_chart", title=spec.title):
+        return _cached_chart(df, spec)
+
+
+def _cached_chart(df, spec):
+    version = df.attrs.get("data_version")
+    if version is None:
+        return render_png(df, spec)
+    key = (version, spec)
+    with _lock:
+        png = _images.get(key)
+        if png is not None:
+            _images.move_to_end(key)
+            return png
+    png = _carried_over(df, spec)
+    if png is None:
+        png = render_png(df, spec)
+    with _lock:
+        _images[key] = png
+        while len(_images) > CACHE_SIZE:
+            _images.popitem(last=False)
+    return png
+
+
+def _carried_over(df, spec):
+    # A chart plots every year of its columns, so after an incremental update
+    # the previous version's image is still valid only when no year was
+    # appended and none of its columns changed
+    update = update_of(df)
+    if update is None or update.appended or update.columns.intersection(spec.columns):
+        return None
+    with _lock:
+        return _images.get((update.previous, spec))
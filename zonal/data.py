@@ -0,0 +1,166 @@
+"""Cached loading of the GISTEMP 'Zonal Annual Means' table.
+
+The CSV is parsed at most once per file version. A version is identified by
+the path, the modification time and a hash of the file content, so a new
+download from NASA is picked up on the next rerun without restarting the app.
+Parsed tables live in memory for the lifetime of the process, shared by every
+rerun and every session, and are also written to a columnar ``.npy`` sidecar
+that later cold starts memory-map instead of parsing the CSV.
+
+A table that replaces an older version of the same file carries that
+version in ``attrs["previous_version"]``, so zonal.features can update the
+derived series incrementally.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CSV = "ZonAnn.Ts+dSST.csv"
+
+
+class DataVersion(NamedTuple):
+    path: str
+    mtime_ns: int
+    size: int
+    digest: str
+
+
+# The variables of the table, shown in the app's "explaining the variables"
+# expander. Built once per process and shared by every session
+VARIABLES = pd.DataFrame({
+    "Variable Index": [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14],
+    "Variable Name": [
+        "Year", "Glob", "NHem", "SHem", "24N-90N", "24S-24N", "90S-24S", "64N-90N",
+        "44N-64N", "24N-44N", "EQU-24N", "24S-EQU", "44S-24S", "64S-44S", "90S-64S"
+    ],
+    "Description": [
+        "The year for which the data is reported.",
+        "Global average of the parameter (averaged over the entire Earth).",
+        "Northern Hemisphere average of the parameter (averaged from 0°N to 90°N).",
+        "Southern Hemisphere average of the parameter (averaged from 0°S to 90°S).",
+        "Average of the parameter for the latitudinal band from 24°N to 90°N.",
+        "Average of the parameter for the latitudinal band from 24°S to 24°N. Covers the tropics and subtropics, including the equatorial region.",
+        "Average of the parameter for the latitudinal band from 90°S to 24°S.",
+        "Average of the parameter for the latitudinal band from 64°N to 90°N. Focuses on the Arctic Circle and polar regions in the Northern Hemisphere.",
+        "Average of the parameter for the latitudinal band from 44°N to 64°N. Covers the mid-latitudes in the Northern Hemisphere, including temperate regions.",
+        "Average of the parameter for the latitudinal band from 24°N to 44°N. Covers the subtropical and warm temperate regions in the Northern Hemisphere.",
+        "Average of the parameter for the latitudinal band from the Equator (0°) to 24°N. Focuses on the northern tropics, from the equator to 24°N.",
+        "Average of the parameter for the latitudinal band from 24°S to the Equator (0°). Focuses on the southern tropics, from 24°S to the equator.",
+        "Average of the parameter for the latitudinal band from 44°S to 24°S. Covers the subtropical and warm temperate regions in the Southern Hemisphere.",
+        "Average of the parameter for the latitudinal band from 64°S to 44°S. Covers the mid-latitudes in the Southern Hemisphere, including temperate regions.",
+        "Average of the parameter for the latitudinal band from 90°S to 64°S. Focuses on the Antarctic Circle and polar regions in the Southern Hemisphere."
+    ]
+})
+
+_lock = threading.Lock()
+_digests = {}  # path -> (mtime_ns, size, digest)
+_tables = {}   # path -> (DataVersion, DataFrame)
+
+
+def cache_dir(path):
+    """Directory holding the binary sidecars for the CSV at ``path``."""
+    return os.environ.get("ZONAL_CACHE_DIR") or os.path.join(os.path.dirname(path), ".cache")
+
+
+def data_version(path=DEFAULT_CSV):
+    """Return the current DataVersion of ``path``.
+
+    The content hash is only recomputed when the modification time or the size
+    of the file changed since the last call.
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    known = _digests.get(path)
+    if known is not None and known[:2] == (stat.st_mtime_ns, stat.st_size):
+        digest = known[2]
+    else:
+        with open(path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:16]
+        _digests[path] = (stat.st_mtime_ns, stat.st_size, digest)
+    return DataVersion(path, stat.st_mtime_ns, stat.st_size, digest)
+
+
+def load_zonal_annual(path=DEFAULT_CSV):
+    """Return the parsed zonal table for the current version of ``path``.
+
+    The returned DataFrame is shared between callers and must be treated as
+    read-only; its ``attrs["data_version"]`` holds the content hash.
+    """
+    version = data_version(path)
+    with _lock:
+        cached = _tables.get(version.path)
+        if cached is not None and cached[0].digest == version.digest:
+            return cached[1]
+        df = _read_sidecar(version)
+        if df is None:
+            df = pd.read_csv(version.path)
+            _write_sidecar(version, df)
+        df.attrs["data_version"] = version.digest
+        if cached is not None:
+            df.attrs["previous_version"] = cached[0].digest
+        _tables[version.path] = (version, df)
+        return df
+
+
+def _sidecar_paths(version):
+    stem = os.path.splitext(os.path.basename(version.path))[0]
+    base = os.path.join(cache_dir(version.path), f"{stem}-{version.digest}")
+    return base + ".npy", base + ".json"
+
+
+def _read_sidecar(version):
+    values_path, meta_path = _sidecar_paths(version)
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        values = np.load(values_path, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+    if values.shape != (meta["rows"], len(meta["columns"])):
+        return None
+    return pd.DataFrame({
+        col: np.asarray(values[:, i], dtype=dtype)
+        for i, (col, dtype) in enumerate(zip(meta["columns"], meta["dtypes"]))
+    })
+
+
+def _write_sidecar(version, df):
+    values_path, meta_path = _sidecar_paths(version)
+    meta = {
+        "source": os.path.basename(version.path),
+        "rows": len(df),
+        "columns": df.columns.tolist(),
+        "dtypes": [str(dtype) for dtype in df.dtypes],
+    }
+    try:
+        os.makedirs(os.path.dirname(values_path), exist_ok=True)
+        _remove_stale_sidecars(version)
+        # Column-major so each column is a contiguous slice of the memmap
+        values = np.asfortranarray(df.to_numpy(dtype=np.float64))
+        tmp = values_path + ".tmp.npy"
+        np.save(tmp, values)
+        os.replace(tmp, values_path)
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(meta_path + ".tmp", meta_path)
+    except OSError:
+        # A read-only checkout still works, it just parses the CSV on cold start
+        pass
+
+
+def _remove_stale_sidecars(version):
+    directory = cache_dir(version.path)
+    stem = os.path.splitext(os.path.basename(version.path))[0]
+    # Exactly this source's sidecars: "<stem>-" alone also prefixes other
+    # sources' names (e.g. "data-2024.csv" for "data.csv")
+    sidecar = re.compile(rf"{re.escape(stem)}-([0-9a-f]{{16}})\.(npy|json)")
+    for name in os.listdir(directory):
+        match = sidecar.fullmatch(name)
+        if match is not None and match.group(1) != version.digest:
+            os.remove(os.path.join(directory, name))
@@ -0,0 +1,201 @@
+"""Derived series (yearly differences, accumulations) for every zone at once.
+
+All zone columns are stacked into one contiguous 2-D float64 array and each
+derived series is computed with a single NumPy operation over that array,
+instead of inserting one DataFrame column per zone. The result is a compact,
+read-only frame (int16 Year, float32 values) cached per data version.
+
+GISTEMP appends a year annually and revises recent values monthly. When a
+table carries ``attrs["previous_version"]`` and that version's features are
+still cached, only the rows from the first changed one onward are
+recomputed, continuing the accumulation from the previous cumulative value.
+The result is bit-identical to a full recompute
+(``benchmarks/bench_incremental.py`` checks this on random updates).
+"""
+import threading
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+
+# Each derived series is a function (blocks, previous, start): ``blocks`` are
+# the series computed so far ("" is the raw zone values), ``previous`` is this
+# series in the previous data version (None for a full compute) and rows
+# before ``start`` are copied from it.
+
+def _diff(blocks, previous=None, start=0):
+    # Same as DataFrame.diff(): NaN in the first row, then x[t] - x[t-1]
+    values = blocks[""]
+    out = np.empty_like(values)
+    if start == 0:
+        out[0] = np.nan
+        start = 1
+    else:
+        out[:start] = previous[:start]
+    np.subtract(values[start:], values[start - 1:-1], out=out[start:])
+    return out
+
+
+def _accum(blocks, previous=None, start=0):
+    # Same as DataFrame.cumsum(): NaNs are skipped but kept in the output
+    diffs = blocks["_diff"][start:]
+    missing = np.isnan(diffs)
+    out = np.empty_like(blocks["_diff"])
+    if start == 0:
+        np.cumsum(np.where(missing, 0.0, diffs), axis=0, out=out)
+    else:
+        # np.cumsum adds row by row, so seeding it with the running sum at
+        # start - 1 gives exactly the values of a full recompute
+        out[:start] = previous[:start]
+        seeded = np.vstack([_running_sum(previous, start), np.where(missing, 0.0, diffs)])
+        out[start:] = np.cumsum(seeded, axis=0)[1:]
+    out[start:][missing] = np.nan
+    return out
+
+
+def _running_sum(accum, start):
+    # The cumulative sum behind accum[start - 1]: NaN rows add 0 to it, so it
+    # is the last non-NaN value above ``start``, or 0 when there is none
+    valid = ~np.isnan(accum[:start])
+    last = start - 1 - np.argmax(valid[::-1], axis=0)
+    carried = accum[last, np.arange(accum.shape[1])]
+    return np.where(valid.any(axis=0), carried, 0.0)
+
+
+# Derived series in computation order: column suffix -> function
+DERIVED_SERIES = (
+    ("_diff", _diff),
+    ("_accum", _accum),
+)
+
+
+class Update(NamedTuple):
+    """How a data version differs from the version its features were updated from."""
+    previous: str         # data version the update started from
+    first_year: int       # first year with a revised or appended value
+    appended: int         # number of rows added at the end
+    columns: frozenset    # feature columns with at least one changed value
+
+
+_CACHE_SIZE = 4
+_lock = threading.Lock()
+_cache = {}    # data version -> (feature frame, float64 blocks)
+_updates = {}  # data version -> Update
+
+
+def zone_columns(df):
+    """Names of the zone columns of a raw table (everything except Year)."""
+    return [col for col in df.columns if col != "Year"]
+
+
+def derived_columns(df, suffix):
+    """Names of the ``suffix`` series for every zone of the raw table ``df``."""
+    return [f"{col}{suffix}" for col in zone_columns(df)]
+
+
+def compute_blocks(df):
+    """Return ``{suffix: 2-D float64 array}`` for the raw values and every derived series."""
+    blocks = {"": np.ascontiguousarray(df[zone_columns(df)].to_numpy(dtype=np.float64))}
+    for suffix, func in DERIVED_SERIES:
+        blocks[suffix] = func(blocks)
+    return blocks
+
+
+def first_changed_row(old_years, old_values, years, values):
+    """Index of the first row of ``values`` that is new or differs from ``old_values``.
+
+    Returns 0 when the update cannot be incremental: rows were removed, the
+    years before the change differ or the zones differ. NaN equals NaN.
+    """
+    n = len(old_values)
+    if len(values) < n or values.shape[1:] != old_values.shape[1:]:
+        return 0
+    same = (values[:n] == old_values) | (np.isnan(values[:n]) & np.isnan(old_values))
+    changed = ~same.all(axis=1)
+    start = int(np.argmax(changed)) if changed.any() else n
+    if not np.array_equal(np.asarray(years[:start]), np.asarray(old_years[:start])):
+        return 0
+    return start
+
+
+def update_blocks(previous, values, start):
+    """Recompute every derived series from row ``start``, reusing ``previous`` above it."""
+    blocks = {"": values}
+    for suffix, func in DERIVED_SERIES:
+        blocks[suffix] = func(blocks, previous[suffix], start) if start else func(blocks)
+    return blocks
+
+
+def update_of(df):
+    """The Update that produced the features of ``df``'s data version, or None."""
+    with _lock:
+        return _updates.get(df.attrs.get("data_version"))
+
+
+def frame_from_blocks(years, blocks, zones):
+    """Assemble the compact read-only feature frame from computed blocks."""
+    columns = [f"{zone}{suffix}" for suffix in blocks for zone in zones]
+    values = np.concatenate(list(blocks.values()), axis=1).astype(np.float32)
+    values.flags.writeable = False
+    year = np.asarray(years, dtype=np.int16)
+    year.flags.writeable = False
+    frame = pd.DataFrame(values, columns=columns, copy=False)
+    frame.insert(0, "Year", year)
+    return frame
+
+
+def build_features(df):
+    """Return the raw zones plus every derived series as one compact frame.
+
+    Columns are ``Year``, the zone columns, then each zone's ``_diff`` and
+    ``_accum`` series, in the same order the app used to add them. Frames are
+    cached by ``df.attrs["data_version"]`` and shared, so they are read-only.
+    """
+    version = df.attrs.get("data_version")
+    if version is not None:
+        with _lock:
+            cached = _cache.get(version)
+            previous = _cache.get(df.attrs.get("previous_version"))
+        if cached is not None:
+            return cached[0]
+    else:
+        previous = None
+    zones = zone_columns(df)
+    update = None
+    if previous is not None and previous[0].columns[1:].tolist() == [
+            f"{zone}{suffix}" for suffix in previous[1] for zone in zones]:
+        old_frame, old_blocks = previous
+        values = np.ascontiguousarray(df[zones].to_numpy(dtype=np.float64))
+        start = first_changed_row(old_frame["Year"].to_numpy(), old_blocks[""], df["Year"].to_numpy(), values)
+        blocks = update_blocks(old_blocks, values, start)
+        if start:
+            update = _describe_update(df.attrs["previous_version"], df["Year"], old_blocks, blocks, zones, start)
+    else:
+        blocks = compute_blocks(df)
+    frame = frame_from_blocks(df["Year"], blocks, zones)
+    frame.attrs["data_version"] = version
+    if version is not None:
+        with _lock:
+            _cache[version] = (frame, blocks)
+            if update is not None:
+                _updates[version] = update
+            while len(_cache) > _CACHE_SIZE:
+                _updates.pop(next(iter(_cache)), None)
+                _cache.pop(next(iter(_cache)))
+    return frame
+
+
+def _describe_update(previous, years, old_blocks, blocks, zones, start):
+    n = len(old_blocks[""])
+    columns = set()
+    for suffix, block in blocks.items():
+        old = old_blocks[suffix][start:]
+        new = block[start:n]
+        same = (new == old) | (np.isnan(new) & np.isnan(old))
+        columns.update(f"{zone}{suffix}" for zone, unchanged in zip(zones, same.all(axis=0)) if not unchanged)
+        if len(block) > n:
+            columns.update(f"{zone}{suffix}" for zone in zones)
+    # Nothing changed at all when start is past the last row
+    first_year = int(years.iloc[start]) if start < len(years) else int(years.iloc[-1]) + 1
+    return Update(previous, first_year, len(years) - n, frozenset(columns))
@@ -0,0 +1,200 @@
+"""Bounded-memory ingest of larger GISTEMP-style products.
+
+Two inputs are supported besides the 146-row ZonAnn table:
+
+* monthly zonal tables: a CSV with ``Year``, ``Month`` and one column per
+  zone, read in chunks and reduced to annual means as it streams;
+* gridded anomalies: a ``(months, lat, lon)`` float32 ``.npy`` array (NaN
+  where missing) with a JSON sidecar describing its axes, read through a
+  memory map one block of months at a time and aggregated into area-weighted
+  means for arbitrary latitude bands.
+
+Both produce the same table as load_zonal_annual (``Year`` plus one column
+per band), so the features, charts and map work on them unchanged. Memory
+use depends on the block size, not on the size of the input.
+
+Both layouts are this module's own, not NASA's. NASA's monthly tables
+(GLB/NH/SH.Ts+dSST.csv: a title line, then ``Year,Jan,...,Dec,J-D,...`` with
+``***`` for missing months) hold a single global or hemispheric series, not
+one column per zone, and its gridded product is NetCDF, which would need a
+netCDF library. load_source rejects both with a ValueError naming the
+accepted layouts; a NetCDF grid can be saved as the ``.npy`` layout above.
+"""
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from zonal.data import load_zonal_annual
+
+# Latitude bounds of every ZonAnn column, so gridded data yields the same table
+DEFAULT_BANDS = {
+    "Glob": (-90, 90),
+    "NHem": (0, 90),
+    "SHem": (-90, 0),
+    "24N-90N": (24, 90),
+    "24S-24N": (-24, 24),
+    "90S-24S": (-90, -24),
+    "64N-90N": (64, 90),
+    "44N-64N": (44, 64),
+    "24N-44N": (24, 44),
+    "EQU-24N": (0, 24),
+    "24S-EQU": (-24, 0),
+    "44S-24S": (-44, -24),
+    "64S-44S": (-64, -44),
+    "90S-64S": (-90, -64),
+}
+
+# Upper bound for one block of grid cells read from the memory map
+BLOCK_BYTES = 64 * 2**20
+
+CSV_CHUNK_ROWS = 100_000
+
+_lock = threading.Lock()
+_tables = {}  # version -> DataFrame
+
+
+def _stat_version(path, *extra):
+    # Hashing gigabytes on every rerun is too slow; the file's identity is
+    # its path, mtime and size
+    stat = os.stat(path)
+    key = json.dumps([os.path.abspath(path), stat.st_mtime_ns, stat.st_size, *extra])
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def _cached(version, build):
+    with _lock:
+        df = _tables.get(version)
+    if df is None:
+        df = build()
+        df.attrs["data_version"] = version
+        with _lock:
+            # The version this one replaces, for incremental feature updates
+            if _tables:
+                df.attrs["previous_version"] = next(iter(_tables))
+            _tables.clear()
+            _tables[version] = df
+    return df
+
+
+def grid_metadata(path):
+    """Axes of a gridded ``.npy`` file, from its ``<path>.json`` sidecar.
+
+    The sidecar holds ``lat`` (cell-centre latitudes), ``start_year`` and
+    optionally ``lon``.
+    """
+    with open(path + ".json") as f:
+        return json.load(f)
+
+
+def band_weights(lat, bands):
+    """``(nlat, nbands)`` area weights: cos(latitude) inside each band, 0 outside."""
+    lat = np.asarray(lat, dtype=np.float64)
+    bounds = np.array(list(bands.values()), dtype=np.float64)
+    inside = (lat[:, None] >= bounds[:, 0]) & (lat[:, None] <= bounds[:, 1])
+    return inside * np.cos(np.deg2rad(lat))[:, None]
+
+
+def grid_band_means(path, bands=DEFAULT_BANDS, out=None, block_bytes=BLOCK_BYTES):
+    """Monthly area-weighted band means of the gridded anomalies at ``path``.
+
+    Returns a ``(months, nbands)`` float64 array, written into ``out`` if given
+    (e.g. a memory map, for inputs with very many time steps).
+    """
+    grid = np.load(path, mmap_mode="r")
+    months, nlat, nlon = grid.shape
+    weights = band_weights(grid_metadata(path)["lat"], bands)
+    if out is None:
+        out = np.empty((months, len(bands)))
+    # Each block is converted to float64
+    step = max(block_bytes // (nlat * nlon * 8), 1)
+    for start in range(0, months, step):
+        block = np.asarray(grid[start:start + step], dtype=np.float64)
+        valid = ~np.isnan(block)
+        # Per-latitude sums and counts over longitude, then per-band weighting
+        sums = np.where(valid, block, 0.0).sum(axis=2)
+        counts = valid.sum(axis=2)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            zonal = sums / counts
+            has_data = counts > 0
+            numerator = np.where(has_data, zonal, 0.0) @ weights
+            denominator = has_data @ weights
+            out[start:start + step] = numerator / denominator
+    return out
+
+
+def annual_means(monthly, start_year, columns):
+    """Reduce ``(months, ncols)`` monthly values to a Year + columns table of complete years."""
+    years = len(monthly) // 12
+    values = np.asarray(monthly[:years * 12]).reshape(years, 12, -1)
+    df = pd.DataFrame(np.nanmean(values, axis=1), columns=list(columns))
+    df.insert(0, "Year", np.arange(start_year, start_year + years))
+    return df
+
+
+def load_grid(path, bands=DEFAULT_BANDS):
+    """Annual band table of the gridded anomalies at ``path``."""
+    version = _stat_version(path, sorted(bands.items()))
+
+    def build():
+        monthly = grid_band_means(path, bands)
+        return annual_means(monthly, grid_metadata(path)["start_year"], bands)
+
+    return _cached(version, build)
+
+
+def load_monthly_csv(path, chunk_rows=CSV_CHUNK_ROWS):
+    """Annual table of a monthly zonal CSV (``Year``, ``Month``, zone columns), read in chunks."""
+    version = _stat_version(path)
+
+    def build():
+        sums = counts = None
+        for chunk in pd.read_csv(path, chunksize=chunk_rows):
+            zones = chunk.drop(columns=["Year", "Month"])
+            grouped = zones.groupby(chunk["Year"])
+            chunk_sums, chunk_counts = grouped.sum(), grouped.count()
+            sums = chunk_sums if sums is None else sums.add(chunk_sums, fill_value=0)
+            counts = chunk_counts if counts is None else counts.add(chunk_counts, fill_value=0)
+        # Only complete years, like the annual table NASA publishes
+        months = counts.max(axis=1)
+        means = (sums / counts)[months == 12]
+        return means.rename_axis("Year").reset_index()
+
+    return _cached(version, build)
+
+
+_ACCEPTED = (
+    "the annual ZonAnn table (Year,Glob,NHem,...), a monthly zonal CSV (Year,Month,<zones>) "
+    "or a gridded .npy with a .json sidecar"
+)
+
+
+def load_source(path):
+    """Load any supported input as an annual zonal table.
+
+    ``.npy`` files are gridded anomalies, CSVs with a ``Month`` column are
+    monthly zonal tables and other CSVs starting with a ``Year`` column are
+    the annual ZonAnn table. Anything else, including NASA's wide monthly
+    tables and NetCDF grids, raises ValueError.
+    """
+    if path.endswith(".npy"):
+        return load_grid(path)
+    if path.endswith((".nc", ".nc4", ".nc.gz")):
+        raise ValueError(f"{path}: NetCDF grids are not read; save the anomalies as a (months, lat, lon) "
+                         f"float32 .npy with a .json sidecar (see grid_metadata). Accepted: {_ACCEPTED}")
+    with open(path, errors="replace") as f:
+        header = f.readline().strip().split(",")
+        if header[0] != "Year":
+            # NASA's monthly tables start with a title line
+            header = f.readline().strip().split(",")
+    if "Jan" in header:
+        raise ValueError(f"{path}: wide monthly tables (Year,Jan,...,Dec) hold one global or hemispheric "
+                         f"series, not one column per zone. Accepted: {_ACCEPTED}")
+    if header[0] != "Year" or len(header) < 2:
+        raise ValueError(f"{path}: not a zonal table. Accepted: {_ACCEPTED}")
+    if "Month" in header:
+        return load_monthly_csv(path)
+    return load_zonal_annual(path)
@@ -0,0 +1,221 @@
+"""Opt-in timing and memory probes for the sections of a script run.
+
+Disabled unless the ZONAL_TRACE environment variable is set (to anything but
+"0"); when disabled every probe returns a shared no-op object, so the cost is
+one function call. ZONAL_TRACE=time records timers only, anything else also
+records memory. When enabled:
+
+* ``start_run()`` opens a trace for the current script run (one per thread),
+* ``begin(name)`` closes the previous top-level section and opens the next
+  one, so a top-to-bottom script needs one call per section,
+* ``section(name)`` is a context manager for nested spans (chart renders),
+* ``fragment(name)`` wraps the body of an ``st.fragment``: a nested span
+  during a full run, its own trace when streamlit reruns only the fragment,
+* ``finish_run()`` closes the trace, appends it to ZONAL_TRACE_FILE (default
+  ``.cache/trace.jsonl``) and returns it for the diagnostics panel.
+
+Each span records wall time and, through tracemalloc, the change in traced
+memory and the peak reached while it was open. Memory is process-wide, so
+with several sessions running at once the memory figures overlap, and
+tracemalloc slows the whole process down several times.
+
+Trace lines are Chrome trace events; ``python -m zonal.instrument
+trace.jsonl trace.json`` wraps them into a file chrome://tracing and Perfetto
+open directly.
+"""
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+ENABLED = os.environ.get("ZONAL_TRACE", "0") not in ("", "0")
+MEMORY = ENABLED and os.environ.get("ZONAL_TRACE") != "time"
+TRACE_FILE = os.environ.get("ZONAL_TRACE_FILE", os.path.join(".cache", "trace.jsonl"))
+
+_local = threading.local()
+_write_lock = threading.Lock()
+
+
+class _Null:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _Null()
+
+
+class Trace:
+    def __init__(self):
+        self.run_start = time.perf_counter()
+        self.events = []
+        self._open = []       # stack of open spans
+        self._top = None      # current top-level section opened by begin()
+        if MEMORY and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def _update_peaks(self):
+        if not MEMORY:
+            return
+        peak = tracemalloc.get_traced_memory()[1]
+        for span in self._open:
+            span["peak"] = max(span["peak"], peak)
+        tracemalloc.reset_peak()
+
+    def open(self, name, category, args):
+        self._update_peaks()
+        span = {"name": name, "cat": category, "args": args, "start": time.perf_counter(),
+                "mem": tracemalloc.get_traced_memory()[0] if MEMORY else 0, "peak": 0}
+        self._open.append(span)
+        return span
+
+    def close(self, span):
+        self._update_peaks()
+        self._open.remove(span)
+        end = time.perf_counter()
+        args = dict(span["args"])
+        if MEMORY:
+            args["mem_delta_kib"] = (tracemalloc.get_traced_memory()[0] - span["mem"]) / 1024
+            args["peak_kib"] = (span["peak"] - span["mem"]) / 1024
+        self.events.append({
+            "name": span["name"],
+            "cat": span["cat"],
+            "ph": "X",
+            "ts": span["start"] * 1e6,
+            "dur": (end - span["start"]) * 1e6,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": args,
+        })
+
+    def table(self):
+        """One row per span: name, category, milliseconds and memory, in start order."""
+        rows = []
+        for event in sorted(self.events, key=lambda event: event["ts"]):
+            row = {"Section": event["name"], "Kind": event["cat"], "ms": round(event["dur"] / 1e3, 2)}
+            if "mem_delta_kib" in event["args"]:
+                row["Memory Δ KiB"] = round(event["args"]["mem_delta_kib"], 1)
+                row["Peak KiB"] = round(event["args"]["peak_kib"], 1)
+            rows.append(row)
+        return rows
+
+
+class _Span:
+    def __init__(self, trace, name, category, args):
+        self.trace, self.name, self.category, self.args = trace, name, category, args
+
+    def __enter__(self):
+        self.span = self.trace.open(self.name, self.category, self.args)
+        return self
+
+    def __exit__(self, *exc):
+        self.trace.close(self.span)
+        return False
+
+
+def current():
+    """The trace of the current script run, or None."""
+    return getattr(_local, "trace", None)
+
+
+def start_run():
+    if not ENABLED:
+        return None
+    _local.trace = Trace()
+    return _local.trace
+
+
+def begin(name):
+    """Close the current top-level section and open ``name``."""
+    if not ENABLED:
+        return
+    trace = current()
+    if trace is None:
+        return
+    if trace._top is not None:
+        trace.close(trace._top)
+    trace._top = trace.open(name, "section", {})
+
+
+def section(name, **args):
+    """Context manager timing a nested span of the current run."""
+    if not ENABLED:
+        return _NULL
+    trace = current()
+    if trace is None:
+        return _NULL
+    return _Span(trace, name, "render", args)
+
+
+class _FragmentRun:
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.trace = start_run()
+        self.span = self.trace.open(self.name, "fragment", {})
+        return self
+
+    def __exit__(self, *exc):
+        self.trace.close(self.span)
+        finish_run("fragment run")
+        return False
+
+
+def fragment(name):
+    """Context manager for the body of an ``st.fragment``.
+
+    Inside a full run it is a nested span; when streamlit reruns only the
+    fragment there is no run trace, so the fragment records and writes its
+    own.
+    """
+    if not ENABLED:
+        return _NULL
+    trace = current()
+    if trace is None:
+        return _FragmentRun(name)
+    return _Span(trace, name, "fragment", {})
+
+
+def finish_run(name="script run"):
+    """Close the run's trace, append it to TRACE_FILE and return it."""
+    if not ENABLED:
+        return None
+    trace = current()
+    _local.trace = None
+    if trace is None:
+        return None
+    if trace._top is not None:
+        trace.close(trace._top)
+        trace._top = None
+    trace.events.append({
+        "name": name, "cat": "run", "ph": "X", "ts": trace.run_start * 1e6,
+        "dur": (time.perf_counter() - trace.run_start) * 1e6,
+        "pid": os.getpid(), "tid": threading.get_ident(), "args": {"wall_time": time.time()},
+    })
+    directory = os.path.dirname(TRACE_FILE)
+    with _write_lock:
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(TRACE_FILE, "a") as f:
+            for event in trace.events:
+                f.write(json.dumps(event) + "\n")
+    return trace
+
+
+def to_chrome_trace(jsonl_path, json_path):
+    """Wrap trace lines into the JSON array format chrome://tracing loads."""
+    with open(jsonl_path) as f:
+        events = [json.loads(line) for line in f if line.strip()]
+    with open(json_path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("usage: python -m zonal.instrument TRACE.jsonl TRACE.json")
+    to_chrome_trace(sys.argv[1], sys.argv[2])
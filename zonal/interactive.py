@@ -0,0 +1,97 @@
+"""Client-side (Vega-Lite) backend for the multi-zone comparison charts.
+
+With the matplotlib backend every change of a multiselect reruns the script
+and rasterizes a new PNG on the server. The Vega-Lite backend instead sends
+every selectable series once, as one compact row per year, and the browser
+does the rest: clicking legend entries shows or hides zones (shift-click for
+several), dragging pans, scrolling zooms and hovering shows values, all
+without a server rerun.
+
+The backend is chosen with the ZONAL_CHART_BACKEND environment variable
+("matplotlib", the default, or "vega-lite").
+"""
+import math
+import os
+import threading
+
+MATPLOTLIB = "matplotlib"
+VEGA_LITE = "vega-lite"
+BACKENDS = (MATPLOTLIB, VEGA_LITE)
+
+# Values are sent with this many decimals; the data itself has two
+DECIMALS = 4
+
+_lock = threading.Lock()
+_specs = {}  # (data version, chart spec, visible columns) -> Vega-Lite spec
+
+
+def chart_backend():
+    """Return the configured backend for the comparison charts."""
+    backend = os.environ.get("ZONAL_CHART_BACKEND", MATPLOTLIB).strip().lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"ZONAL_CHART_BACKEND must be one of {', '.join(BACKENDS)}, not {backend!r}")
+    return backend
+
+
+def _records(df, columns):
+    # One row per year with a field per zone; the browser folds it into long form
+    rows = []
+    values = df[list(columns)].to_numpy(dtype=float).round(DECIMALS)
+    for year, row in zip(df["Year"].tolist(), values.tolist()):
+        record = {"Year": year}
+        record.update((col, None if math.isnan(v) else v) for col, v in zip(columns, row))
+        rows.append(record)
+    return rows
+
+
+def vega_lite_spec(df, spec, visible):
+    """Vega-Lite spec for ``spec`` (a zonal.charts.ChartSpec over every selectable column).
+
+    ``visible`` lists the columns shown initially; the others are faded out
+    until selected in the legend.
+    """
+    columns = list(spec.columns)
+    return {
+        "$schema": "https://vega.github.io/schema/vega-lite/v5.json",
+        "title": spec.title,
+        "height": 420,
+        "data": {"values": _records(df, columns)},
+        "transform": [{"fold": columns, "as": ["Zone", "Value"]}],
+        "params": [
+            {
+                "name": "zones",
+                "select": {"type": "point", "fields": ["Zone"]},
+                "bind": "legend",
+                "value": [{"Zone": col} for col in visible],
+            },
+            {"name": "zoom", "select": "interval", "bind": "scales"},
+        ],
+        "mark": {"type": "line", "strokeWidth": 1.5},
+        "encoding": {
+            "x": {"field": "Year", "type": "quantitative", "title": spec.xlabel, "axis": {"format": "d"}},
+            "y": {"field": "Value", "type": "quantitative", "title": spec.ylabel},
+            "color": {"field": "Zone", "type": "nominal", "sort": columns, "legend": {"title": "Zone"}},
+            "opacity": {"condition": {"param": "zones", "value": 1}, "value": 0.06},
+            "tooltip": [
+                {"field": "Year", "type": "quantitative", "format": "d"},
+                {"field": "Zone", "type": "nominal"},
+                {"field": "Value", "type": "quantitative", "format": ".2f"},
+            ],
+        },
+    }
+
+
+def comparison_chart(df, spec, visible):
+    """Return the cached Vega-Lite spec for ``spec`` with ``visible`` selected."""
+    key = (df.attrs.get("data_version"), spec, tuple(visible))
+    with _lock:
+        cached = _specs.get(key)
+    if cached is None:
+        cached = vega_lite_spec(df, spec, visible)
+        if key[0] is not None:
+            with _lock:
+                # Only keep the specs of the current data version
+                for stale in [k for k in _specs if k[0] != key[0]]:
+                    del _specs[stale]
+                _specs[key] = cached
+    return cached
@@ -0,0 +1,208 @@
+"""Pre-rendered map frames for every year of the Part III slider.
+
+There are only ~145 possible maps, so a build step renders all of them in a
+process pool and stores them as PNG files under
+``.cache/map_frames/<map style>/<source file>-<data version>/<year>.png``,
+where the map style is zonal.maps.STYLE_VERSION. The app then serves a year
+by reading its file, without any matplotlib work. Frames missing from the
+cache (e.g. before the first build) are rendered on demand and stored.
+
+After an incremental data update (see zonal.features.update_of) the frames
+of the years before the first changed one are linked from the previous
+version's directory instead of being rendered again. Once a version's
+frames are written, the directories of its source's older versions are
+removed; the one it was updated from is kept. Frames of other map styles,
+which the current renderer never reads, are removed too.
+
+    python -m zonal.map_frames [--workers N] [--csv PATH]
+
+``--csv`` may be any input zonal.ingest.load_source reads; the app stores
+and looks up frames under the cache directory of its ZONAL_SOURCE.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from zonal import instrument
+from zonal.data import DEFAULT_CSV, cache_dir
+from zonal.features import build_features, update_of
+from zonal.ingest import load_source
+from zonal.maps import STYLE_VERSION, ZONE_ACCUM_COLUMNS, band_table, render_map
+
+_lock = threading.Lock()
+_frames = {}  # (directory, year) -> PNG bytes
+_pruned = set()  # frame directories whose older versions were removed
+
+
+def _version_dir(csv_path, version):
+    path = os.path.abspath(csv_path)
+    return os.path.join(cache_dir(path), "map_frames", STYLE_VERSION, f"{os.path.basename(path)}-{version}")
+
+
+def frame_dir(df, csv_path=DEFAULT_CSV):
+    """Directory holding the frames for the data version of ``df``."""
+    return _version_dir(csv_path, df.attrs["data_version"])
+
+
+def _remove_stale_frames(df, csv_path):
+    """Remove the frame directories of older data versions of ``csv_path`` and of other map styles.
+
+    The version ``df`` was updated from is kept: unchanged frames are linked
+    from it, and sessions still showing it read from it.
+    """
+    directory = frame_dir(df, csv_path)
+    with _lock:
+        if directory in _pruned:
+            return
+        _pruned.add(directory)
+    keep = {directory}
+    update = update_of(df)
+    if update is not None:
+        keep.add(_version_dir(csv_path, update.previous))
+    parent, source = os.path.dirname(directory), os.path.basename(os.path.abspath(csv_path))
+    try:
+        names = os.listdir(parent)
+        styles = os.listdir(os.path.dirname(parent))
+    except OSError:
+        return
+    for name in names:
+        path = os.path.join(parent, name)
+        # Versions are hex digests, so the source name is everything before the last dash
+        if name.rsplit("-", 1)[0] == source and path not in keep:
+            shutil.rmtree(path, ignore_errors=True)
+    # Frames of other styles (including ones stored before styles were part of
+    # the path) were drawn by another renderer, whatever their source
+    for name in styles:
+        if name != STYLE_VERSION:
+            shutil.rmtree(os.path.join(os.path.dirname(parent), name), ignore_errors=True)
+
+
+def _frame_path(directory, year):
+    return os.path.join(directory, f"{int(year)}.png")
+
+
+def _store(directory, year, png):
+    os.makedirs(directory, exist_ok=True)
+    # A unique temporary file: sessions of one process may store the same year at once
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(png)
+        os.replace(tmp, _frame_path(directory, year))
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def _render_frame(args):
+    directory, year, df_bands = args
+    start = time.perf_counter()
+    _store(directory, year, render_map(df_bands))
+    return year, time.perf_counter() - start
+
+
+def map_frame(df, year, csv_path=DEFAULT_CSV):
+    """Return the PNG map for ``year``, from memory, the disk cache or a fresh render."""
+    with instrument.section("map_frame", year=int(year)):
+        return _map_frame(df, year, csv_path)
+
+
+def _map_frame(df, year, csv_path):
+    directory = frame_dir(df, csv_path)
+    key = (directory, int(year))
+    png = _frames.get(key)
+    if png is not None:
+        return png
+    try:
+        with open(_frame_path(directory, year), "rb") as f:
+            png = f.read()
+    except FileNotFoundError:
+        png = _carry_over(df, csv_path, year)
+        if png is None:
+            png = render_map(band_table(df, year))
+            try:
+                _store(directory, year, png)
+            except OSError:
+                pass
+        _remove_stale_frames(df, csv_path)
+    with _lock:
+        # Only keep the frames of the current data version in memory
+        for stale in [k for k in _frames if k[0] != directory]:
+            del _frames[stale]
+        _frames[key] = png
+    return png
+
+
+def _unchanged(update, year):
+    # A frame shows one year of the zones' accumulated values
+    return year < update.first_year or not update.columns.intersection(ZONE_ACCUM_COLUMNS)
+
+
+def _carry_over(df, csv_path, year):
+    """Link ``year``'s frame from the previous data version if the update left it unchanged."""
+    update = update_of(df)
+    if update is None or not _unchanged(update, year):
+        return None
+    directory = frame_dir(df, csv_path)
+    source = _frame_path(_version_dir(csv_path, update.previous), year)
+    try:
+        with open(source, "rb") as f:
+            png = f.read()
+        os.makedirs(directory, exist_ok=True)
+        target = _frame_path(directory, year)
+        try:
+            os.link(source, target)
+        except FileExistsError:
+            pass
+        except OSError:
+            _store(directory, year, png)
+    except OSError:
+        return None
+    return png
+
+
+def build_frames(df, csv_path=DEFAULT_CSV, workers=None, years=None):
+    """Render the frames of ``years`` (default: every year of ``df``) in a process pool.
+
+    By default frames an incremental update left unchanged are linked from
+    the previous version instead. Returns the frame directory and the
+    per-frame render times in seconds.
+    """
+    directory = frame_dir(df, csv_path)
+    os.makedirs(directory, exist_ok=True)
+    if years is None:
+        years = [year for year in df["Year"].tolist() if _carry_over(df, csv_path, year) is None]
+    tasks = [(directory, year, band_table(df, year)) for year in years]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = dict(pool.map(_render_frame, tasks, chunksize=8))
+    with _lock:
+        for key in [key for key in _frames if key[0] == directory]:
+            del _frames[key]
+    _remove_stale_frames(df, csv_path)
+    return directory, results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-render the Part III map for every year.")
+    parser.add_argument("--csv", default=os.environ.get("ZONAL_SOURCE", DEFAULT_CSV),
+                        help="input table (see zonal.ingest.load_source)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    df = build_features(load_source(args.csv))
+    start = time.perf_counter()
+    directory, results = build_frames(df, args.csv, args.workers)
+    elapsed = time.perf_counter() - start
+    render = np.array(list(results.values())) * 1e3
+    print(f"built {len(results)} frames in {elapsed:.2f} s -> {directory}")
+    print(f"render per frame: median {np.median(render):.1f} ms, max {render.max():.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
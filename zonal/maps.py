@@ -0,0 +1,230 @@
+"""Accumulated-temperature band map for Part III.
+
+The cartopy basemap (land, ocean, coastlines, borders) and the colorbar do not
+depend on the selected year, so they are rasterized once per process, in two
+layers: land and ocean, which the bands cover, and a transparent overlay of
+the coastlines, borders, map frame and colorbar, which is drawn above them. A
+year's map is then the 8 latitude bands alpha-blended over the first layer
+with the overlay composited on top, which is plain NumPy work on the pixel
+arrays instead of a new cartopy figure.
+
+cartopy and cmocean are imported on first use: they are slow to import and
+are not needed at all when the frames come from the map frame cache.
+"""
+import hashlib
+import io
+import threading
+from typing import NamedTuple
+
+import matplotlib
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import Normalize
+from matplotlib.cm import ScalarMappable
+from matplotlib.figure import Figure
+from PIL import Image
+
+# Define the zone accumulation columns
+ZONE_ACCUM_COLUMNS = [
+    "64N-90N_accum", "44N-64N_accum", "24N-44N_accum", "EQU-24N_accum",
+    "24S-EQU_accum", "44S-24S_accum", "64S-44S_accum", "90S-64S_accum"
+]
+
+# Define latitudinal bounds for each zone
+LAT_ZONES = {
+    "64N-90N": (64, 90),
+    "44N-64N": (44, 64),
+    "24N-44N": (24, 44),
+    "EQU-24N": (0, 24),
+    "24S-EQU": (-24, 0),
+    "44S-24S": (-44, -24),
+    "64S-44S": (-64, -44),
+    "90S-64S": (-90, -64),
+}
+
+# Temperatures are clipped to this range before picking a color
+MIN_TEMP = -4
+MAX_TEMP = 4
+
+BAND_ALPHA = 0.9
+
+# Same output as st.pyplot: 200 dpi, cropped like bbox_inches="tight"
+DPI = 200
+PAD_INCHES = 0.1
+
+# Bump when the basemap or the way the bands are drawn on it changes
+BASEMAP_REVISION = 2
+
+# Digest of everything above that a rendered map depends on. Stored maps
+# (zonal.map_frames, zonal.report) are keyed by it, so a new renderer or
+# style does not serve images drawn by the old one.
+STYLE_VERSION = hashlib.sha256(repr((
+    matplotlib.__version__, BASEMAP_REVISION, LAT_ZONES, MIN_TEMP, MAX_TEMP, BAND_ALPHA, DPI, PAD_INCHES,
+)).encode()).hexdigest()[:16]
+
+
+class Basemap(NamedTuple):
+    pixels: np.ndarray   # (height, width, 4) uint8 RGBA of the whole map without bands
+    under: np.ndarray    # (rows, columns, 3) uint8 land and ocean of the map area
+    overlay: np.ndarray  # (rows, columns, 4) uint8 RGBA drawn above the bands in the map area
+    left: int            # map area inside ``pixels``, in pixel columns/rows
+    top: int
+    right: int
+    bottom: int
+
+
+_lock = threading.Lock()
+_basemaps = {}
+
+
+def colormap():
+    import cmocean
+
+    # Use the 'balance' colormap from cmocean (NASA/NOAA-like)
+    return cmocean.cm.balance
+
+
+def band_table(df, year, lat_zones=LAT_ZONES, zone_accum_columns=ZONE_ACCUM_COLUMNS):
+    """Return the per-band table (Zone, latitudes, Temperature, ColorNorm) for ``year``."""
+    df_year = df[df["Year"] == year]
+    if df_year.empty:
+        temperatures = np.full(len(zone_accum_columns), 0.001)
+    else:
+        # Ensure accumulation columns are numeric and replace NaN with 0.001
+        temperatures = df_year[zone_accum_columns].apply(pd.to_numeric, errors="coerce").fillna(0.001).to_numpy()[0]
+    zones = [col.replace("_accum", "") for col in zone_accum_columns]
+    bounds = np.array([lat_zones.get(zone, (0, 0)) for zone in zones])
+    df_bands = pd.DataFrame({
+        "Zone": zones,
+        "Latitude_Min": bounds[:, 0],
+        "Latitude_Max": bounds[:, 1],
+        "Temperature": temperatures,
+    })
+    # Normalize temperatures to the range [-4, 4]
+    df_bands["ColorNorm"] = (np.clip(df_bands["Temperature"], MIN_TEMP, MAX_TEMP) - MIN_TEMP) / (MAX_TEMP - MIN_TEMP)
+    return df_bands
+
+
+def basemap(figsize=None):
+    """Return the rasterized basemap and colorbar, rendering it on first use."""
+    key = tuple(figsize) if figsize is not None else None
+    with _lock:
+        cached = _basemaps.get(key)
+        if cached is None:
+            cached = _basemaps[key] = _render_basemap(figsize)
+    return cached
+
+
+def _render_basemap(figsize):
+    import cartopy.crs as ccrs
+    import cartopy.feature as cfeature
+
+    fig = Figure(figsize=figsize, dpi=DPI)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot(projection=ccrs.PlateCarree())
+
+    # Add map features
+    below = [
+        ax.add_feature(cfeature.LAND, color="lightgray"),
+        ax.add_feature(cfeature.OCEAN, color="lightblue"),
+    ]
+    above = [
+        ax.add_feature(cfeature.COASTLINE, linewidth=0.5),
+        ax.add_feature(cfeature.BORDERS, linestyle=":", linewidth=0.5),
+        *ax.spines.values(),
+    ]
+
+    # Add a colorbar
+    sm = ScalarMappable(cmap=colormap(), norm=Normalize(vmin=MIN_TEMP, vmax=MAX_TEMP))
+    sm.set_array([])
+    colorbar = fig.colorbar(sm, ax=ax, orientation="horizontal", label="Temperature Variation (°C)")
+    above.append(colorbar.ax)
+
+    # Set map extent
+    ax.set_global()
+    canvas.draw()
+    pixels = np.array(canvas.buffer_rgba())
+    tight = fig.get_tightbbox(canvas.get_renderer()).padded(PAD_INCHES)
+
+    # The same figure again with only what the bands cover (below), then
+    # only what is drawn over them, on a transparent background (overlay)
+    for artist in above:
+        artist.set_visible(False)
+    canvas.draw()
+    under = np.array(canvas.buffer_rgba())
+    for artist in below + [fig.patch, ax.patch]:
+        artist.set_visible(False)
+    for artist in above:
+        artist.set_visible(True)
+    canvas.draw()
+    overlay = np.array(canvas.buffer_rgba())
+
+    height = pixels.shape[0]
+    # Display coordinates have their origin at the bottom left, rows at the top
+    area = ax.get_window_extent()
+    crop_left = max(int(np.floor(tight.x0 * DPI)), 0)
+    crop_top = max(height - int(np.ceil(tight.y1 * DPI)), 0)
+    crop_right = min(int(np.ceil(tight.x1 * DPI)), pixels.shape[1])
+    crop_bottom = min(height - int(np.floor(tight.y0 * DPI)), height)
+    left, right = int(round(area.x0)), int(round(area.x1))
+    top, bottom = height - int(round(area.y1)), height - int(round(area.y0))
+    layers = (
+        pixels[crop_top:crop_bottom, crop_left:crop_right],
+        under[top:bottom, left:right, :3],
+        overlay[top:bottom, left:right],
+    )
+    for layer in layers:
+        layer.flags.writeable = False
+    return Basemap(
+        *layers,
+        left=left - crop_left,
+        top=top - crop_top,
+        right=right - crop_left,
+        bottom=bottom - crop_top,
+    )
+
+
+def band_colors(color_norm):
+    """RGBA colors (0-1 floats) for an array of normalized band temperatures."""
+    return colormap()(np.asarray(color_norm, dtype=float))
+
+
+def compose_map(df_bands, figsize=None):
+    """Return the RGBA pixels of the basemap with the latitude bands drawn on top."""
+    base = basemap(figsize)
+    pixels = base.pixels.copy()
+    area = base.under.astype(np.float32)
+
+    # Latitude at the centre of each pixel row of the map area (90 at the top)
+    rows = base.bottom - base.top
+    latitudes = 90 - (np.arange(rows) + 0.5) * 180 / rows
+    lat_min = df_bands["Latitude_Min"].to_numpy()
+    lat_max = df_bands["Latitude_Max"].to_numpy()
+    inside = (latitudes[:, None] >= lat_min) & (latitudes[:, None] < lat_max)
+    covered = inside.any(axis=1)
+    band = inside.argmax(axis=1)
+
+    colors = band_colors(df_bands["ColorNorm"].to_numpy())[:, :3] * 255
+    row_colors = colors[band[covered]][:, None, :]
+    area[covered] = BAND_ALPHA * row_colors + (1 - BAND_ALPHA) * area[covered]
+
+    # Coastlines, borders and the map frame go over the bands, only where
+    # the overlay is not fully transparent
+    drawn = base.overlay[:, :, 3] > 0
+    overlay = base.overlay[drawn]
+    alpha = overlay[:, 3:] / np.float32(255)
+    area[drawn] = alpha * overlay[:, :3] + (1 - alpha) * area[drawn]
+    pixels[base.top:base.bottom, base.left:base.right, :3] = np.rint(area).astype(np.uint8)
+    return pixels
+
+
+def encode_png(pixels):
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="PNG", compress_level=1)
+    return buffer.getvalue()
+
+
+def render_map(df_bands, figsize=None):
+    """Return the band map as PNG bytes, ready for ``st.image``."""
+    return encode_png(compose_map(df_bands, figsize))
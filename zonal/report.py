@@ -0,0 +1,222 @@
+"""Headless batch report: every figure of the app as PNG files, without Streamlit.
+
+The figures are the Part I/II charts, the default multi-zone comparisons,
+the single-zone plot of every zone, the default rolling trends chart for
+each statistic and the Part III map for every year. They come from the same
+ChartSpecs (zonal.charts) and band tables (zonal.maps) as the app, are
+rendered with Agg in a process pool and written to the output directory
+together with ``manifest.json``.
+
+The manifest records a digest of each figure's inputs: its spec, the
+data it plots and the style version of its renderer (zonal.charts and
+zonal.maps STYLE_VERSION, which the app's map frames are keyed by too).
+On the next run, figures whose digest and file are unchanged
+are skipped, so after a data update only the figures it touched are
+rendered again. Files of figures that no longer exist are removed.
+
+    python -m zonal.report [--out DIR] [--source PATH] [--workers N] [--force]
+    python -m zonal.report --scaling 1,2,4,8   # wall time per worker count
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from zonal import charts, maps
+from zonal.charts import (
+    GROWTH_DEFAULT, PART1_EXTRATROPICS, PART1_NORTH, PART2_EXTRATROPICS, PART2_NORTH, ROLLING_DEFAULT,
+    TRENDS_DEFAULT, growth_spec, render_png, rolling_spec, single_zone_spec, trends_spec,
+)
+from zonal.data import DEFAULT_CSV
+from zonal.features import build_features, zone_columns
+from zonal.ingest import load_source
+from zonal.map_frames import frame_dir
+from zonal.maps import band_table, render_map
+from zonal.rolling import DEFAULT_WINDOW, STATISTICS, rolling_trends
+
+MANIFEST = "manifest.json"
+
+# Part of every digest, so a new renderer or style invalidates the figures it draws
+RENDERER = {"chart": charts.STYLE_VERSION, "map": maps.STYLE_VERSION}
+
+
+class ReportFigure(NamedTuple):
+    name: str     # file path relative to the output directory
+    kind: str     # "chart" or "map"
+    payload: tuple  # (frame, ChartSpec) for a chart, (band table, app frame path or None) for a map
+
+
+def figures(raw, source=None):
+    """Every figure of the report for the raw table ``raw``.
+
+    When ``source`` (the path ``raw`` was loaded from) is given, maps
+    pre-rendered for the app from it (zonal.map_frames) are copied.
+    """
+    df = build_features(raw)
+    zones = zone_columns(raw)
+    charts = [
+        ("part1_extratropics", df, PART1_EXTRATROPICS),
+        ("part1_north", df, PART1_NORTH),
+        ("part1_trends_default", df, trends_spec(TRENDS_DEFAULT)),
+        ("part2_extratropics", df, PART2_EXTRATROPICS),
+        ("part2_north", df, PART2_NORTH),
+        ("part2_growth_default", df, growth_spec(GROWTH_DEFAULT)),
+    ]
+    charts += [(f"zones/{zone}", df, single_zone_spec(zone)) for zone in zones]
+    rolling = rolling_trends(raw, DEFAULT_WINDOW)
+    charts += [
+        (f"part4_rolling{DEFAULT_WINDOW}{suffix}", rolling, rolling_spec(ROLLING_DEFAULT, DEFAULT_WINDOW, suffix))
+        for suffix in STATISTICS
+    ]
+    result = [
+        # Only the plotted columns are sent to the workers
+        ReportFigure(f"{name}.png", "chart", (frame[["Year", *spec.columns]], spec))
+        for name, frame, spec in charts
+    ]
+    frames = None if source is None else frame_dir(df, source)
+    result += [
+        ReportFigure(f"maps/{year}.png", "map", (band_table(df, year), frames and os.path.join(frames, f"{year}.png")))
+        for year in df["Year"].tolist()
+    ]
+    return result
+
+
+def inputs_digest(figure):
+    """Digest of everything ``figure``'s image depends on."""
+    h = hashlib.sha256(f"{RENDERER[figure.kind]}\0{figure.kind}\0".encode())
+    table = figure.payload[0]
+    if figure.kind == "chart":
+        h.update(repr(figure.payload[1]).encode())
+    h.update("\0".join(table.columns).encode())
+    h.update(pd.util.hash_pandas_object(table, index=False).to_numpy().tobytes())
+    return h.hexdigest()[:16]
+
+
+def _render(task):
+    out, figure = task
+    start = time.perf_counter()
+    if figure.kind == "chart":
+        png = render_png(*figure.payload)
+    else:
+        bands, frame = figure.payload
+        png = None
+        if frame is not None:
+            try:
+                with open(frame, "rb") as f:
+                    png = f.read()
+            except FileNotFoundError:
+                pass
+        if png is None:
+            png = render_map(bands)
+    path = os.path.join(out, figure.name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(png)
+    os.replace(tmp, path)
+    return figure.name, time.perf_counter() - start
+
+
+def _read_manifest(out):
+    try:
+        with open(os.path.join(out, MANIFEST)) as f:
+            return json.load(f)["figures"]
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def build_report(raw, out, source=None, workers=None, force=False):
+    """Render the figures of ``raw`` whose inputs changed into ``out``.
+
+    ``source`` is passed on to figures(). Returns ``{name: render seconds}``
+    of the figures rendered this run and the number of figures skipped.
+    """
+    os.makedirs(out, exist_ok=True)
+    # Read even when forcing: the figures it lists that no longer exist are removed
+    previous = _read_manifest(out)
+    entries, tasks = {}, []
+    for figure in figures(raw, source):
+        digest = inputs_digest(figure)
+        entries[figure.name] = {"kind": figure.kind, "inputs": digest}
+        known = previous.get(figure.name)
+        if (force or known is None or known["inputs"] != digest
+                or not os.path.exists(os.path.join(out, figure.name))):
+            tasks.append((out, figure))
+    # Charts first: they are the slowest, so the maps fill the gaps at the end
+    tasks.sort(key=lambda task: task[1].kind != "chart")
+    rendered = {}
+    if tasks:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rendered = dict(pool.map(_render, tasks, chunksize=4))
+    for name in previous.keys() - entries.keys():
+        try:
+            os.remove(os.path.join(out, name))
+        except FileNotFoundError:
+            pass
+    manifest = {
+        "data_version": raw.attrs.get("data_version"),
+        "renderer": RENDERER,
+        "figures": entries,
+    }
+    tmp = os.path.join(out, f"{MANIFEST}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp, os.path.join(out, MANIFEST))
+    return rendered, len(entries) - len(rendered)
+
+
+def scaling(raw, worker_counts):
+    """Print the wall time of a full report for each worker count.
+
+    Every figure is rendered, including the maps the app may have cached.
+    """
+    print(f"{'workers':>7} {'wall s':>7} {'speedup':>8} {'efficiency':>10}")
+    first = None
+    for workers in worker_counts:
+        out = tempfile.mkdtemp()
+        try:
+            start = time.perf_counter()
+            build_report(raw, out, workers=workers, force=True)
+            elapsed = time.perf_counter() - start
+        finally:
+            shutil.rmtree(out)
+        first = first or (workers, elapsed)
+        # Relative to the first worker count
+        speedup = first[1] / elapsed
+        print(f"{workers:7d} {elapsed:7.2f} {speedup:7.2f}x {speedup * first[0] / workers:10.0%}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render every figure of the app to PNG files.")
+    parser.add_argument("--source", default=os.environ.get("ZONAL_SOURCE", DEFAULT_CSV),
+                        help="input table (see zonal.ingest.load_source)")
+    parser.add_argument("--out", default="report", help="output directory")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="render every figure, even unchanged ones")
+    parser.add_argument("--scaling", help="comma-separated worker counts to time a full report with, instead")
+    args = parser.parse_args(argv)
+
+    raw = load_source(args.source)
+    if args.scaling:
+        scaling(raw, [int(workers) for workers in args.scaling.split(",")])
+        return
+    start = time.perf_counter()
+    rendered, skipped = build_report(raw, args.out, args.source, args.workers, args.force)
+    elapsed = time.perf_counter() - start
+    print(f"rendered {len(rendered)} figures, skipped {skipped} unchanged, in {elapsed:.2f} s -> {args.out}")
+    if rendered:
+        render = np.array(list(rendered.values())) * 1e3
+        print(f"render per figure: median {np.median(render):.1f} ms, max {render.max():.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
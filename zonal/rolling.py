@@ -0,0 +1,106 @@
+"""Rolling-window trend statistics for every zone.
+
+For a window of ``w`` years ending at each year, the OLS slope of the
+anomaly against time, the mean anomaly and the volatility around that
+local trend are computed for all zones at once. Nothing is refitted per
+window. Prefix sums of y, t·y and y² (and of the valid-value count) give
+each window's sums by one subtraction, so every window length costs O(n)
+for the whole table. Windows with a missing value are NaN.
+
+Results are cached per data version and window length, like
+zonal.features: compact read-only frames with int16 Year and float32
+values. Their ``data_version`` includes the window, so charts of different
+windows are cached separately.
+"""
+import threading
+
+import numpy as np
+
+from zonal.features import frame_from_blocks, zone_columns
+
+# Column suffix -> description, in column order
+STATISTICS = {
+    "_slope": "Trend (°C per decade)",
+    "_mean": "Mean anomaly (°C)",
+    "_vol": "Volatility around the trend (°C)",
+}
+
+# Range and default of the app's window slider, in years
+MIN_WINDOW, MAX_WINDOW, DEFAULT_WINDOW = 5, 60, 30
+
+_CACHE_SIZE = 16
+_lock = threading.Lock()
+_cache = {}  # (data version, window) -> frame
+
+
+def _window_sums(prefix, window):
+    # Sum over the ``window`` rows ending at each row, for rows window-1 onward
+    return prefix[window:] - prefix[:-window]
+
+
+def window_statistics(values, window):
+    """Return (slope per year, mean, residual std) of every trailing ``window``.
+
+    ``values`` is a (years, zones) float64 array with one row per year. Each
+    result has the same shape; the first ``window - 1`` rows and windows
+    containing NaN are NaN.
+    """
+    n, zones = values.shape
+    out = np.full((3, n, zones), np.nan)
+    if window < 3 or window > n:
+        return out
+    valid = ~np.isnan(values)
+    y = np.where(valid, values, 0.0)
+    # Time is measured from the start of each window, so the sums over t
+    # only depend on the window length
+    t = np.arange(n, dtype=np.float64)[:, None]
+    zero = np.zeros((1, zones))
+    count = _window_sums(np.concatenate([zero, np.cumsum(valid, axis=0)]), window)
+    sum_y = _window_sums(np.concatenate([zero, np.cumsum(y, axis=0)]), window)
+    sum_ty = _window_sums(np.concatenate([zero, np.cumsum(t * y, axis=0)]), window)
+    sum_yy = _window_sums(np.concatenate([zero, np.cumsum(y * y, axis=0)]), window)
+    start = np.arange(n - window + 1, dtype=np.float64)[:, None]
+    sum_ty -= start * sum_y
+
+    local_t = np.arange(window, dtype=np.float64)
+    t_mean = local_t.mean()
+    s_tt = ((local_t - t_mean) ** 2).sum()
+    mean = sum_y / window
+    s_ty = sum_ty - t_mean * sum_y
+    s_yy = np.maximum(sum_yy - sum_y * mean, 0.0)
+    slope = s_ty / s_tt
+    residual = np.maximum(s_yy - slope * s_ty, 0.0)
+    volatility = np.sqrt(residual / (window - 2))
+
+    complete = count == window
+    for i, stat in enumerate((slope, mean, volatility)):
+        out[i, window - 1:] = np.where(complete, stat, np.nan)
+    return out
+
+
+def rolling_trends(df, window):
+    """Return the rolling statistics of every zone of the raw table ``df``.
+
+    Columns are ``Year`` (the last year of each window) then, for each
+    statistic of STATISTICS, one column per zone named ``<zone><suffix>``.
+    Slopes are in °C per decade.
+    """
+    version = df.attrs.get("data_version")
+    key = (version, window)
+    if version is not None:
+        with _lock:
+            cached = _cache.get(key)
+        if cached is not None:
+            return cached
+    zones = zone_columns(df)
+    slope, mean, volatility = window_statistics(df[zones].to_numpy(dtype=np.float64), window)
+    frame = frame_from_blocks(df["Year"], dict(zip(STATISTICS, (slope * 10, mean, volatility))), zones)
+    frame.attrs["data_version"] = None if version is None else f"{version}-rolling{window}"
+    if version is not None:
+        with _lock:
+            for stale in [k for k in _cache if k[0] != version]:
+                del _cache[stale]
+            _cache[key] = frame
+            while len(_cache) > _CACHE_SIZE:
+                _cache.pop(next(iter(_cache)))
+    return frame
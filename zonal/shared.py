@@ -0,0 +1,34 @@
+"""Process-wide state shared by every session.
+
+The parsed table, the derived features, the basemap, the rendered charts and
+the map frames are all held once per process in the module-level caches of
+zonal.data, zonal.features, zonal.maps, zonal.charts and zonal.map_frames.
+Sessions only keep their widget selections.
+
+Streamlit runs a full ``gc.collect()`` after every script run. With pandas,
+matplotlib, cartopy and scipy loaded the collector walks ~175k objects, about
+70 ms per run while holding the GIL, so every other session waits too.
+``freeze()`` moves everything that exists at that point into the permanent
+generation the collector skips. Reference counting still frees these
+objects, but cycles among them are never collected, so it must run before
+any session exists: objects of a session frozen with it would leak. It is
+therefore called by the deployment launcher, zonal.serve, once the modules
+are imported and the shared caches loaded, and not by the page script.
+"""
+import gc
+import threading
+
+_lock = threading.Lock()
+_frozen = False
+
+
+def freeze():
+    """Exclude the objects alive now from later garbage collections (once per process)."""
+    global _frozen
+    with _lock:
+        if _frozen:
+            return
+        # Collect first so that no garbage ends up in the permanent generation
+        gc.collect()
+        gc.freeze()
+        _frozen = True
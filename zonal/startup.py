@@ -0,0 +1,137 @@
+"""Startup profile of the Streamlit entry point.
+
+Measures, each in a fresh interpreter so nothing is already imported:
+
+* the import-time breakdown of the script's top-level imports
+  (``python -X importtime``), and
+* the time to first paint, from the start of the script run until its first
+  element is sent to the browser, plus the time of the full first run.
+
+``profile_startup()`` returns the numbers as a dict so a check can assert
+against them; the CLI prints them and exits non-zero when a budget is missed.
+
+    python -m zonal.startup [--first-paint-budget-ms N] [--import-budget-ms N]
+"""
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+
+DEFAULT_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Miniproject_JIANG_Streamlit.py")
+
+# Dependencies that should only be imported by the sections that need them
+HEAVY_MODULES = ("cartopy", "cmocean", "shapely", "pyproj", "folium", "branca")
+
+_FIRST_PAINT_DRIVER = """
+import json, sys, time
+from streamlit.runtime.scriptrunner_utils.script_run_context import ScriptRunContext
+from streamlit.testing.v1 import AppTest
+
+first_paint = []
+enqueue = ScriptRunContext.enqueue
+
+def timed_enqueue(self, msg):
+    if not first_paint and msg.HasField("delta") and msg.delta.HasField("new_element"):
+        first_paint.append(time.perf_counter())
+    enqueue(self, msg)
+
+ScriptRunContext.enqueue = timed_enqueue
+at = AppTest.from_file(sys.argv[1], default_timeout=float(sys.argv[2]))
+start = time.perf_counter()
+at.run()
+end = time.perf_counter()
+print(json.dumps({
+    "first_paint_ms": (first_paint[0] - start) * 1e3 if first_paint else None,
+    "full_run_ms": (end - start) * 1e3,
+    "exceptions": [e.message for e in at.exception],
+    "heavy_modules_loaded": sorted({name.split(".")[0] for name in sys.modules} & set(sys.argv[3].split(","))),
+}))
+"""
+
+
+def top_level_imports(script=DEFAULT_SCRIPT):
+    """Module names imported at the top level of ``script``."""
+    with open(script, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def import_breakdown(modules, cwd=None):
+    """Return ``{module: cumulative import ms}`` for importing ``modules`` in order."""
+    code = "; ".join(f"import {module}" for module in modules)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=cwd, capture_output=True, text=True, check=True,
+    )
+    breakdown = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Nested imports are indented; only keep the ones requested directly
+        if name.startswith("  ") or not cumulative.strip().isdigit():
+            continue
+        breakdown[name.strip()] = int(cumulative) / 1e3
+    return {module: breakdown[module] for module in modules if module in breakdown}
+
+
+def first_paint(script=DEFAULT_SCRIPT, timeout=300):
+    """Run ``script`` once headlessly and return its first-paint timings."""
+    result = subprocess.run(
+        [sys.executable, "-c", _FIRST_PAINT_DRIVER, script, str(timeout), ",".join(HEAVY_MODULES)],
+        cwd=os.path.dirname(os.path.abspath(script)), capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def profile_startup(script=DEFAULT_SCRIPT):
+    """Return the import breakdown and first-paint timings of ``script``."""
+    modules = top_level_imports(script)
+    imports = import_breakdown(modules, cwd=os.path.dirname(os.path.abspath(script)))
+    profile = {"imports_ms": imports, "total_import_ms": sum(imports.values())}
+    profile.update(first_paint(script))
+    return profile
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile the startup of the Streamlit app.")
+    parser.add_argument("--script", default=DEFAULT_SCRIPT)
+    parser.add_argument("--first-paint-budget-ms", type=float, default=None)
+    parser.add_argument("--import-budget-ms", type=float, default=None)
+    parser.add_argument("--json", action="store_true", help="print the raw profile as JSON")
+    args = parser.parse_args(argv)
+
+    profile = profile_startup(args.script)
+    if args.json:
+        print(json.dumps(profile, indent=2))
+    else:
+        for module, ms in sorted(profile["imports_ms"].items(), key=lambda item: -item[1]):
+            print(f"{ms:9.1f} ms  import {module}")
+        print(f"{profile['total_import_ms']:9.1f} ms  total imports")
+        print(f"{profile['first_paint_ms']:9.1f} ms  time to first paint")
+        print(f"{profile['full_run_ms']:9.1f} ms  full first run")
+        print("heavy modules loaded:", ", ".join(profile["heavy_modules_loaded"]) or "none")
+
+    failed = []
+    if args.first_paint_budget_ms is not None and profile["first_paint_ms"] > args.first_paint_budget_ms:
+        failed.append(f"first paint {profile['first_paint_ms']:.0f} ms > {args.first_paint_budget_ms:.0f} ms")
+    if args.import_budget_ms is not None and profile["total_import_ms"] > args.import_budget_ms:
+        failed.append(f"imports {profile['total_import_ms']:.0f} ms > {args.import_budget_ms:.0f} ms")
+    if profile["exceptions"]:
+        failed.append("the script raised: " + "; ".join(profile["exceptions"]))
+    if failed:
+        print("startup budget exceeded: " + ", ".join(failed), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""Synthetic GISTEMP-like inputs of any size, for testing the ingest offline.
+
+Anomalies follow a warming trend that accelerates after 1960 and grows
+towards the North Pole (Arctic amplification), plus noise and a fraction of
+missing cells. Files are written block by block, so generating them needs
+no more memory than ingesting them.
+
+    python -m zonal.synthetic grid anomalies.npy --years 145 --nlat 90 --nlon 180
+    python -m zonal.synthetic monthly ZonMon.csv --years 145
+"""
+import argparse
+import json
+
+import numpy as np
+import pandas as pd
+
+from zonal.ingest import DEFAULT_BANDS
+
+START_YEAR = 1880
+
+
+def _anomaly(years, lat, rng):
+    # years: (n,) fractional years, lat: (m,) latitudes -> (n, m) anomalies
+    warming = 0.004 * (years - START_YEAR) + 0.012 * np.clip(years - 1960, 0, None)
+    amplification = 1 + 1.5 * np.clip(lat / 90, 0, None) ** 2
+    return warming[:, None] * amplification[None, :] - 0.3 + rng.normal(0, 0.25, (len(years), len(lat)))
+
+
+def write_grid(path, years=145, nlat=90, nlon=180, missing=0.05, seed=0, block_months=120):
+    """Write a ``(years * 12, nlat, nlon)`` float32 anomaly grid and its JSON sidecar."""
+    rng = np.random.default_rng(seed)
+    lat = -90 + (np.arange(nlat) + 0.5) * 180 / nlat
+    lon = -180 + (np.arange(nlon) + 0.5) * 360 / nlon
+    months = years * 12
+    grid = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(months, nlat, nlon))
+    for start in range(0, months, block_months):
+        stop = min(start + block_months, months)
+        t = START_YEAR + np.arange(start, stop) / 12
+        block = _anomaly(t, lat, rng)[:, :, None] + rng.normal(0, 0.5, (stop - start, nlat, nlon))
+        block[rng.random(block.shape) < missing] = np.nan
+        grid[start:stop] = block
+    grid.flush()
+    with open(path + ".json", "w") as f:
+        json.dump({"start_year": START_YEAR, "lat": lat.tolist(), "lon": lon.tolist()}, f)
+    return path
+
+
+def write_monthly_csv(path, years=145, bands=DEFAULT_BANDS, seed=0, block_years=50):
+    """Write a monthly zonal CSV (``Year``, ``Month``, one column per band)."""
+    rng = np.random.default_rng(seed)
+    # Representative latitude of each band, for the amplification term
+    centres = np.array([np.mean(bounds) for bounds in bands.values()])
+    for first in range(0, years, block_years):
+        count = min(block_years, years - first)
+        t = START_YEAR + first + np.arange(count * 12) / 12
+        block = pd.DataFrame(_anomaly(t, centres, rng).round(2), columns=list(bands))
+        block.insert(0, "Month", np.tile(np.arange(1, 13), count))
+        block.insert(0, "Year", np.repeat(np.arange(START_YEAR + first, START_YEAR + first + count), 12))
+        block.to_csv(path, mode="w" if first == 0 else "a", header=first == 0, index=False)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write synthetic GISTEMP-like inputs.")
+    parser.add_argument("kind", choices=["grid", "monthly"])
+    parser.add_argument("path")
+    parser.add_argument("--years", type=int, default=145)
+    parser.add_argument("--nlat", type=int, default=90)
+    parser.add_argument("--nlon", type=int, default=180)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    if args.kind == "grid":
+        write_grid(args.path, args.years, args.nlat, args.nlon, seed=args.seed)
+    else:
+        write_monthly_csv(args.path, args.years, seed=args.seed)
+    print(f"wrote {args.path}")
+
+
+if __name__ == "__main__":
+    main()
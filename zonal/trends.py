@@ -0,0 +1,191 @@
+"""Trend models fitted to every zone at once (Part V).
+
+The notebook fits a quadratic and an exponential model to ``64N-90N_accum``
+with sklearn/statsmodels, one zone and one model at a time. Here each model
+has a single design matrix shared by all zones, so one least-squares solve
+with a right-hand side per zone fits every zone together:
+
+* linear:      y = b0 + b1 * Year
+* quadratic:   y = b0 + b1 * Year + b2 * Year^2
+* exponential: log(y + shift) = b0 + b1 * Year, i.e. y = e^b0 * e^(b1 * Year) - shift,
+  with shift = |min(y)| + 1e-5 per zone as in the notebook
+
+Years are centred and scaled before solving, and the coefficients and their
+covariance are mapped back to the raw ``Year`` basis, so estimates, standard
+errors and p-values match statsmodels' OLS on the same design. R² is on the
+original scale of y for every model, like the notebook's r2_score. Missing
+values are filled with 0, as in the notebook.
+"""
+import math
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Model name -> (polynomial degree in Year, fitted on log(y + shift))
+MODELS = {
+    "linear": (1, False),
+    "quadratic": (2, False),
+    "exponential": (1, True),
+}
+
+TERMS = ("const", "Year", "Year^2")
+
+BOOTSTRAP_CHUNK = 250
+
+_lock = threading.Lock()
+_fits = {}  # (data version, columns) -> table
+_r2 = {}    # (data version, columns) -> R² table
+
+
+def _design(years, degree):
+    """Centred/scaled polynomial design and the matrix mapping its coefficients to raw years."""
+    x = np.asarray(years, dtype=np.float64)
+    mean, scale = x.mean(), x.std()
+    design = np.vander((x - mean) / scale, degree + 1, increasing=True)
+    # ((x - mean) / scale)^j = sum_i C[i, j] * x^i
+    to_raw = np.zeros((degree + 1, degree + 1))
+    for j in range(degree + 1):
+        for i in range(j + 1):
+            to_raw[i, j] = math.comb(j, i) * (-mean) ** (j - i) / scale ** j
+    return design, to_raw
+
+
+def _targets(y, log):
+    if not log:
+        return y, np.zeros(y.shape[1])
+    shift = np.abs(y.min(axis=0)) + 1e-5
+    return np.log(y + shift), shift
+
+
+def _t_pvalues(t, dof):
+    try:
+        from scipy import stats
+    except ImportError:
+        # Without scipy, use the normal approximation (dof is ~140 here)
+        return np.vectorize(math.erfc)(np.abs(t) / math.sqrt(2))
+    return 2 * stats.t.sf(np.abs(t), dof)
+
+
+def fit_models(years, y, columns, models=MODELS):
+    """Fit ``models`` to every column of ``y`` (``(n, zones)``) and return one table.
+
+    The table has a row per zone, model and term with the coefficient, its
+    standard error and p-value, and the model's R².
+    """
+    y = np.nan_to_num(np.asarray(y, dtype=np.float64), nan=0.0)
+    n = len(y)
+    total = ((y - y.mean(axis=0)) ** 2).sum(axis=0)
+    frames = []
+    for model, (degree, log) in models.items():
+        design, to_raw = _design(years, degree)
+        target, shift = _targets(y, log)
+        gram_inv = np.linalg.inv(design.T @ design)
+        coef_scaled = gram_inv @ (design.T @ target)
+        fitted = design @ coef_scaled
+
+        dof = n - (degree + 1)
+        sigma2 = ((target - fitted) ** 2).sum(axis=0) / dof
+        coef = to_raw @ coef_scaled
+        cov = to_raw @ gram_inv @ to_raw.T
+        std_err = np.sqrt(np.outer(np.diag(cov), sigma2))
+        p_value = _t_pvalues(coef / std_err, dof)
+
+        predicted = np.exp(fitted) - shift if log else fitted
+        r2 = 1 - ((y - predicted) ** 2).sum(axis=0) / total
+
+        terms = degree + 1
+        frames.append(pd.DataFrame({
+            "Zone": np.tile(columns, terms),
+            "Model": model,
+            "Term": np.repeat(TERMS[:terms], len(columns)),
+            "Coefficient": coef.ravel(),
+            "Std_Error": std_err.ravel(),
+            "P_Value": p_value.ravel(),
+            "R2": np.tile(r2, terms),
+        }))
+    table = pd.concat(frames, ignore_index=True)
+    order = {col: i for i, col in enumerate(columns)}
+    return table.sort_values(["Zone", "Model"], key=lambda s: s.map(order) if s.name == "Zone" else s,
+                             kind="stable", ignore_index=True)
+
+
+def fit_trends(df, columns):
+    """Cached fit_models for the ``columns`` of a feature frame from zonal.features."""
+    key = (df.attrs.get("data_version"), tuple(columns))
+    with _lock:
+        table = _fits.get(key)
+    if table is None:
+        table = fit_models(df["Year"], df[list(columns)], list(columns))
+        if key[0] is not None:
+            with _lock:
+                for stale in [k for k in _fits if k[0] != key[0]]:
+                    del _fits[stale]
+                _fits[key] = table
+    return table
+
+
+def r2_table(table):
+    """R² per zone (rows) and model (columns)."""
+    first = table.drop_duplicates(["Zone", "Model"])
+    return first.pivot(index="Zone", columns="Model", values="R2").reindex(first["Zone"].unique())
+
+
+def fit_r2(df, columns):
+    """Cached r2_table of fit_trends(df, columns), shared by every session."""
+    key = (df.attrs.get("data_version"), tuple(columns))
+    with _lock:
+        r2 = _r2.get(key)
+    if r2 is None:
+        r2 = r2_table(fit_trends(df, columns))
+        if key[0] is not None:
+            with _lock:
+                for stale in [k for k in _r2 if k[0] != key[0]]:
+                    del _r2[stale]
+                _r2[key] = r2
+    return r2
+
+
+def _bootstrap_chunk(args):
+    years, y, degree, log, replicates, seed = args
+    rng = np.random.default_rng(seed)
+    design, to_raw = _design(years, degree)
+    target, _ = _targets(y, log)
+    rows = rng.integers(0, len(y), size=(replicates, len(y)))
+    x = design[rows]                       # (replicates, n, terms)
+    xt = x.transpose(0, 2, 1)
+    coef = np.linalg.solve(xt @ x, xt @ target[rows])
+    return to_raw @ coef                   # (replicates, terms, zones)
+
+
+def bootstrap_intervals(df, columns, model="quadratic", replicates=2000, level=0.95, workers=None, seed=0):
+    """Percentile bootstrap intervals (resampling years) for every zone's coefficients.
+
+    Replicates are split into chunks fitted in a process pool; ``workers=1``
+    runs them in this process.
+    """
+    degree, log = MODELS[model]
+    years = df["Year"].to_numpy(dtype=np.float64)
+    y = np.nan_to_num(df[list(columns)].to_numpy(dtype=np.float64), nan=0.0)
+    sizes = [BOOTSTRAP_CHUNK] * (replicates // BOOTSTRAP_CHUNK)
+    if replicates % BOOTSTRAP_CHUNK:
+        sizes.append(replicates % BOOTSTRAP_CHUNK)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(years, y, degree, log, size, s) for size, s in zip(sizes, seeds)]
+    if workers == 1:
+        chunks = list(map(_bootstrap_chunk, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            chunks = list(pool.map(_bootstrap_chunk, tasks))
+    coef = np.concatenate(chunks)
+    low, high = np.percentile(coef, [50 * (1 - level), 50 * (1 + level)], axis=0)
+    terms = degree + 1
+    return pd.DataFrame({
+        "Zone": np.tile(list(columns), terms),
+        "Model": model,
+        "Term": np.repeat(TERMS[:terms], len(columns)),
+        "CI_Low": low.ravel(),
+        "CI_High": high.ravel(),
+    })